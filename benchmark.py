@@ -0,0 +1,361 @@
+"""
+Benchmark the enrichment pipeline without spending API credits.
+
+Runs Enricher.enrich_dataframe against local stand-ins:
+- a mock Gemini model and a mock TavilyClient (in-process, with latency and errors)
+- a local SerpAPI-compatible HTTP server
+- a local site farm: every firm website is a separate host name, all served from
+  one server on 127.0.0.1 and told apart by the Host header
+
+and reports firms/sec, p50/p95 latency per stage (from the run metrics)
+and peak memory.
+
+    python benchmark.py --firms 200 --workers 8
+    python benchmark.py --firms 500 --error-rate 0.05 --page-kb 200 --json results.json
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import random
+import resource
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import types
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Defaults
+BENCH_FIRMS = 200
+BENCH_WEBSITE_SHARE = 0.5       # Share of firms that already have a website (crawl path); the rest are searched
+BENCH_GEMINI_LATENCY = 0.4      # Seconds per mock Gemini call
+BENCH_TAVILY_LATENCY = 0.3      # Seconds per mock Tavily query
+BENCH_SERP_LATENCY = 0.5        # Seconds per local SerpAPI request
+BENCH_SITE_LATENCY = 0.1        # Seconds per site farm page
+BENCH_ERROR_RATE = 0.02         # Share of provider calls and pages that fail
+BENCH_PAGE_KB = 50              # Size of each site farm page
+BENCH_SITE_DOMAIN = "sitefarm.test"  # Site farm host names end in this; .test never resolves publicly
+BENCH_SEED = 42
+
+BUSINESS_TYPES = ["Interior", "Tour Operator", "NGO", "Architect", "Caterer"]
+LOCATIONS = ["Mumbai", "Pune", "Nagpur", "Nashik", "Thane"]
+
+def site_host(index):
+    """
+    Host name of firm `index` in the site farm
+    """
+    return f"site{index:05d}.{BENCH_SITE_DOMAIN}"
+
+def resolve_site_farm(getaddrinfo):
+    """
+    Wrap socket.getaddrinfo so every site farm host name resolves to 127.0.0.1
+    """
+    def lookup(host, *args, **kwargs):
+        if isinstance(host, str) and host.endswith("." + BENCH_SITE_DOMAIN):
+            host = "127.0.0.1"
+        return getaddrinfo(host, *args, **kwargs)
+    return lookup
+
+def jittered(latency):
+    """
+    Latency with +/- 50% jitter
+    """
+    return latency * random.uniform(0.5, 1.5)
+
+def fail(error_rate):
+    return random.random() < error_rate
+
+class SiteFarmHandler(BaseHTTPRequestHandler):
+    """
+    Serves a small contact site for every site farm host: a homepage
+    linking to contact/about/team pages, padded to the configured size
+    """
+    protocol_version = "HTTP/1.1"
+    latency = BENCH_SITE_LATENCY
+    error_rate = BENCH_ERROR_RATE
+    page_kb = BENCH_PAGE_KB
+
+    def page(self):
+        firm = self.headers.get("Host", "").split(".")[0]
+        number = "".join(char for char in firm if char.isdigit())
+        filler = "<p>" + "Quality interiors and turnkey projects since 1998. " * 20 + "</p>\n"
+        padding = filler * max(1, self.page_kb * 1024 // len(filler))
+        if self.path.startswith("/contact"):
+            body = f"""<html><body><h1>Contact</h1>
+<p>Email: info{firm}@example.in | Phone: +91 98{number[-8:].rjust(8, '0')}</p>
+<p>Address: 12 MG Road, Pune 411001</p>{padding}</body></html>"""
+        else:
+            body = f"""<html><head><title>Firm {firm}</title></head><body>
+<a href="/contact-us">Contact</a> <a href="/about">About</a> <a href="/team">Team</a>
+<a href="https://facebook.com/firm{firm}">Facebook</a>
+<a href="https://instagram.com/firm{firm}">Instagram</a>{padding}</body></html>"""
+        return body.encode()
+
+    def respond(self, send_body):
+        time.sleep(jittered(self.latency))
+        if fail(self.error_rate):
+            status, body = 503, b"unavailable"
+        else:
+            status, body = 200, self.page()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self.respond(True)
+
+    def do_HEAD(self):
+        self.respond(False)
+
+    def log_message(self, *args):
+        pass
+
+class SerpHandler(BaseHTTPRequestHandler):
+    """
+    SerpAPI-compatible /search endpoint returning organic results and a knowledge graph
+    """
+    protocol_version = "HTTP/1.1"
+    latency = BENCH_SERP_LATENCY
+    error_rate = BENCH_ERROR_RATE
+    site_port = None
+
+    def do_GET(self):
+        time.sleep(jittered(self.latency))
+        query = parse_qs(urlparse(self.path).query).get("q", [""])[0]
+        if fail(self.error_rate):
+            status, body = 503, b'{"error": "unavailable"}'
+        else:
+            company = query.split('"')[1] if '"' in query else query
+            website = f"http://{site_host(abs(hash(company)) % 50000)}:{self.site_port}/"
+            status, body = 200, json.dumps({
+                "organic_results": [
+                    {"title": f"{company} - Official Site", "link": website,
+                     "snippet": f"{company}: call 98765 43210 or mail info@example.in", "displayed_link": website},
+                    {"title": f"{company} | Facebook", "link": "https://facebook.com/bench",
+                     "snippet": f"{company} on Facebook", "displayed_link": "facebook.com"}
+                ],
+                "knowledge_graph": {"website": website, "phone": "098765 43210", "address": "12 MG Road, Pune 411001"}
+            }).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class MockGeminiModel:
+    """
+    Stand-in for genai.GenerativeModel answering search, refinement,
+    batch and repair prompts with JSON
+    """
+
+    def __init__(self, latency=BENCH_GEMINI_LATENCY, error_rate=BENCH_ERROR_RATE, site_port=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.site_port = site_port
+
+    def fields(self):
+        website = f"http://{site_host(random.randrange(50000))}:{self.site_port}/"
+        return {
+            "Website": website, "Email": "info@example.in", "Phone": "+91 98765 43210",
+            "Facebook": "https://facebook.com/bench", "Instagram": "BLANK", "LinkedIn": "BLANK",
+            "Owner": "BLANK", "Address": "12 MG Road, Pune 411001"
+        }
+
+    def generate_content(self, prompt, generation_config=None, **kwargs):
+        time.sleep(jittered(self.latency))
+        if fail(self.error_rate):
+            raise RuntimeError("mock Gemini error")
+
+        if "was meant to be" in prompt:
+            text = prompt.split("RESPOND ONLY WITH THE CORRECTED JSON.")[-1].strip()
+        elif "FIRM_ID:" in prompt:
+            ids = [part.split()[0] for part in prompt.split("FIRM_ID: ")[1:]]
+            text = json.dumps([dict(self.fields(), Firm_ID=firm_id, Data_Quality="GOOD", Sources_Used="mock",
+                                    Confidence_Score="8", Validation_Notes="") for firm_id in ids])
+        elif "data validation expert" in prompt:
+            text = json.dumps(dict(self.fields(), Data_Quality="GOOD", Sources_Used="mock",
+                                   Confidence_Score="8", Validation_Notes=""))
+        else:
+            text = json.dumps(dict(self.fields(), Match_Type="EXACT", Confidence="HIGH"))
+        return types.SimpleNamespace(text=text)
+
+class MockTavilyClient:
+    """
+    Stand-in for TavilyClient.search
+    """
+
+    def __init__(self, latency=BENCH_TAVILY_LATENCY, error_rate=BENCH_ERROR_RATE):
+        self.latency = latency
+        self.error_rate = error_rate
+
+    def search(self, query, **kwargs):
+        time.sleep(jittered(self.latency))
+        if fail(self.error_rate):
+            raise RuntimeError("mock Tavily error")
+        company = query.split('"')[1] if '"' in query else query
+        return {"results": [{
+            "url": "https://www.justdial.com/bench",
+            "title": f"{company} in Pune - Justdial",
+            "content": f"{company} Pune. Email: info@example.in Phone: 9876543210 Address: 12 MG Road, Pune 411001"
+        }]}
+
+def start_server(handler, host="127.0.0.1"):
+    server = ThreadingHTTPServer((host, 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def make_firms(count, website_share, site_port):
+    """
+    Build the input DataFrame: unique firms, some with a site farm website
+    """
+    rows = []
+    for i in range(count):
+        has_website = random.random() < website_share
+        rows.append({
+            "No.": i + 1,
+            "Business Type": random.choice(BUSINESS_TYPES),
+            "Company Name": f"Bench Firm {i:05d}",
+            "Location": random.choice(LOCATIONS),
+            "Website": f"http://{site_host(i)}:{site_port}/" if has_website else ""
+        })
+    import pandas as pd
+    from data_scraper.files import prepare_firms
+    return prepare_firms(pd.DataFrame(rows))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scraper against local fake providers")
+    parser.add_argument("--firms", type=int, default=BENCH_FIRMS, help=f"number of firms (default: {BENCH_FIRMS})")
+    parser.add_argument("--workers", type=int, help="firms enriched in parallel (default: config.MAX_WORKERS)")
+    parser.add_argument("--website-share", type=float, default=BENCH_WEBSITE_SHARE,
+                        help=f"share of firms that already have a website (default: {BENCH_WEBSITE_SHARE})")
+    parser.add_argument("--gemini-latency", type=float, default=BENCH_GEMINI_LATENCY)
+    parser.add_argument("--tavily-latency", type=float, default=BENCH_TAVILY_LATENCY)
+    parser.add_argument("--serp-latency", type=float, default=BENCH_SERP_LATENCY)
+    parser.add_argument("--site-latency", type=float, default=BENCH_SITE_LATENCY)
+    parser.add_argument("--error-rate", type=float, default=BENCH_ERROR_RATE,
+                        help=f"share of provider calls and pages that fail (default: {BENCH_ERROR_RATE})")
+    parser.add_argument("--page-kb", type=int, default=BENCH_PAGE_KB,
+                        help=f"size of each site farm page in KB (default: {BENCH_PAGE_KB})")
+    parser.add_argument("--keep-rate-limits", action="store_true",
+                        help="keep the scraper's RATE_LIMITS (by default they are lifted so the pipeline itself is measured)")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="also report peak Python heap via tracemalloc (slower)")
+    parser.add_argument("--seed", type=int, default=BENCH_SEED)
+    parser.add_argument("--json", help="write the results to this JSON file")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    random.seed(args.seed)
+
+    # The scraper writes its cache, log and journal to a scratch working directory
+    output = os.path.abspath(args.json) if args.json else None
+    workdir = tempfile.mkdtemp(prefix="scraper-bench-")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    previous_dir = os.getcwd()
+    os.chdir(workdir)
+    getaddrinfo = socket.getaddrinfo
+    socket.getaddrinfo = resolve_site_farm(getaddrinfo)
+    servers = []
+    try:
+        return run_benchmark(args, output, workdir, servers)
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+        socket.getaddrinfo = getaddrinfo
+        os.chdir(previous_dir)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def run_benchmark(args, output, workdir, servers):
+    """
+    Start the local providers, enrich the firms and report the results.
+    Started servers are added to `servers` so main() can stop them.
+    """
+    from data_scraper import Enricher, config, limits, providers
+    from data_scraper.metrics import metrics
+
+    # Local providers, on loopback only
+    SiteFarmHandler.latency, SiteFarmHandler.error_rate, SiteFarmHandler.page_kb = args.site_latency, args.error_rate, args.page_kb
+    site_farm = start_server(SiteFarmHandler)
+    servers.append(site_farm)
+    SerpHandler.latency, SerpHandler.error_rate = args.serp_latency, args.error_rate
+    SerpHandler.site_port = site_farm.server_port
+    serp_server = start_server(SerpHandler)
+    servers.append(serp_server)
+
+    providers.gemini_model = MockGeminiModel(args.gemini_latency, args.error_rate, site_farm.server_port)
+    providers.tavily_client = MockTavilyClient(args.tavily_latency, args.error_rate)
+    config.SERP_API_URL = f"http://127.0.0.1:{serp_server.server_port}/search"
+    config.CACHE_ENABLED = False
+    config.PAGE_STORE_ENABLED = False
+    if not args.keep_rate_limits:
+        limits.rate_limiters = {name: limits.ProviderLimiter(name) for name in config.RATE_LIMITS}
+    logging.getLogger("data_scraper").setLevel("WARNING")
+
+    df = make_firms(args.firms, args.website_share, site_farm.server_port)
+    workers = args.workers or config.MAX_WORKERS
+    enricher = Enricher(dedup=False, max_workers=workers)
+    print(f"🏁 Benchmarking {args.firms} firms with {workers} workers (scratch dir: {workdir}, removed afterwards)")
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    started = time.perf_counter()
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        enricher.enrich_dataframe(df)
+    elapsed = time.perf_counter() - started
+    heap_peak = tracemalloc.get_traced_memory()[1] if args.tracemalloc else None
+
+    # ru_maxrss is KB on Linux, bytes on macOS
+    snapshot = metrics.snapshot()
+    rss_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    results = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "firms": args.firms,
+        "workers": workers,
+        "elapsed_seconds": round(elapsed, 3),
+        "firms_per_second": round(args.firms / elapsed, 3),
+        "peak_rss_mb": round(rss_peak / 2**20, 1),
+        "peak_heap_mb": round(heap_peak / 2**20, 1) if heap_peak is not None else None,
+        "stages": {
+            stage: {
+                "calls": stats["count"],
+                "p50_ms": round(stats["p50_seconds"] * 1000, 1),
+                "p95_ms": round(stats["p95_seconds"] * 1000, 1)
+            }
+            for stage, stats in snapshot["stages"].items()
+        },
+        "counters": snapshot["counters"],
+        "settings": {key: value for key, value in vars(args).items() if key != "json"}
+    }
+
+    print(f"\n⏱️  {results['elapsed_seconds']}s total, {results['firms_per_second']} firms/sec")
+    print(f"🧠 Peak RSS: {results['peak_rss_mb']} MB" +
+          (f", peak Python heap: {results['peak_heap_mb']} MB" if heap_peak is not None else ""))
+    print(f"\n{'stage':<14}{'calls':>8}{'p50 ms':>10}{'p95 ms':>10}")
+    for stage, stats in results["stages"].items():
+        print(f"{stage:<14}{stats['calls']:>8}{stats['p50_ms']:>10}{stats['p95_ms']:>10}")
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to '{output}'")
+
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -16,4 +16,5 @@ SERP_API_KEY = "YOUR_SERP_API_KEY_HERE"
 # Usage Instructions:
 # 1. Copy this file: cp config_example.py config.py
 # 2. Replace the placeholder values with your actual API keys
-# 3. Import in your scraper: from config import GEMINI_API_KEY, TAVILY_API_KEY, SERP_API_KEY 
\ No newline at end of file
+# 3. Export them before a run (data_scraper/config.py reads the same names from the environment):
+#    export GEMINI_API_KEY=... TAVILY_API_KEY=... SERP_API_KEY=... 
\ No newline at end of file
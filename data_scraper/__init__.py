@@ -0,0 +1,27 @@
+"""
+Find and scrape contact details for a list of firms.
+
+    from data_scraper import Enricher
+
+    enricher = Enricher(sources=["gemini", "serp"])
+    df = enricher.enrich_dataframe(load_firms("firms.csv"))
+
+Importing the package is cheap: pandas, google-generativeai and tavily are
+only imported once they are needed, and provider clients are created on
+first use. Settings live in data_scraper.config.
+"""
+from .enricher import Enricher
+from .files import load_firms, save_results
+from .sources import get_company_details_from_gemini, search_with_serp_api, search_with_tavily
+from .refine import process_refined_data, refine_data_with_gemini
+
+__all__ = [
+    "Enricher",
+    "load_firms",
+    "save_results",
+    "get_company_details_from_gemini",
+    "search_with_serp_api",
+    "search_with_tavily",
+    "process_refined_data",
+    "refine_data_with_gemini",
+]
@@ -0,0 +1,135 @@
+"""
+SQLite response cache so reruns reuse Gemini/Tavily/SERP answers
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from . import config
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """
+    Content-addressed on-disk cache for API responses, backed by SQLite.
+    Entries expire after ttl_seconds and the least recently used entries
+    are evicted once the cache grows past max_entries.
+    """
+    
+    # Check the size bound every N writes rather than on every insert
+    EVICT_EVERY = 100
+    
+    def __init__(self, path, ttl_seconds, max_entries):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.writes = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    provider TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+            self.conn.commit()
+    
+    @staticmethod
+    def make_key(provider, query, params=None):
+        """
+        Build a cache key from the provider, a hash of the query or prompt, and the call parameters
+        """
+        query_hash = hashlib.sha256(query.encode("utf-8")).hexdigest()
+        payload = json.dumps({"provider": provider, "query": query_hash, "params": params or {}}, sort_keys=True, default=str)
+        return f"{provider}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+    
+    def get(self, key):
+        """
+        Return the cached value for key, or None if missing or expired
+        """
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.conn.commit()
+                return None
+            self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+        return json.loads(value)
+    
+    def set(self, key, provider, value):
+        """
+        Store a JSON-serializable value and evict old entries if over the size bound
+        """
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, provider, value, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, provider, json.dumps(value), now, now)
+            )
+            self.writes += 1
+            if self.writes % self.EVICT_EVERY == 0:
+                self.evict()
+            self.conn.commit()
+    
+    def evict(self):
+        """
+        Drop expired entries, then least recently used entries beyond max_entries.
+        Caller must hold the lock.
+        """
+        self.conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        self.conn.execute("""
+            DELETE FROM responses WHERE key IN (
+                SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+
+# Opened on first use, so importing the package never creates the cache file
+response_cache = None
+response_cache_lock = threading.Lock()
+
+def get_response_cache():
+    """
+    Return the shared response cache, or None when config.CACHE_ENABLED is off
+    """
+    global response_cache
+    if not config.CACHE_ENABLED:
+        return None
+    with response_cache_lock:
+        if response_cache is None:
+            response_cache = ResponseCache(config.CACHE_PATH, config.CACHE_TTL_SECONDS, config.CACHE_MAX_ENTRIES)
+    return response_cache
+
+def cached_call(provider, query, params, fetch):
+    """
+    Return a cached response for (provider, query, params), calling fetch() on a miss.
+    Only non-None results are stored, so failed calls are retried on the next run.
+    """
+    response_cache = get_response_cache()
+    if response_cache is None:
+        return fetch()
+    
+    key = ResponseCache.make_key(provider, query, params)
+    cached = response_cache.get(key)
+    metrics.increment("cache_lookups_total", provider=provider, result="miss" if cached is None else "hit")
+    if cached is not None:
+        return cached
+    
+    value = fetch()
+    if value is not None:
+        response_cache.set(key, provider, value)
+    return value
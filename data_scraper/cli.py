@@ -0,0 +1,210 @@
+"""
+Command-line entry point: python -m data_scraper
+"""
+import argparse
+import logging
+import os
+import socket
+
+from . import config, limits
+from .enricher import Enricher
+from .files import ResultSink, load_firms, prepare_firms, read_csv_chunks, save_results
+from .journal import FirmJournal
+from .metrics import metrics
+from .sources import SOURCE_FUNCTIONS
+from .workqueue import WorkQueue
+
+def parse_sources(value):
+    """
+    Parse a comma-separated --sources value such as "gemini,serp"
+    """
+    sources = [name.strip().lower() for name in value.split(",") if name.strip()]
+    unknown = [name for name in sources if name not in SOURCE_FUNCTIONS]
+    if unknown or not sources:
+        raise argparse.ArgumentTypeError(f"unknown sources {', '.join(unknown) or '(none given)'} (choose from {', '.join(SOURCE_FUNCTIONS)})")
+    return sources
+
+def positive_int(value):
+    """
+    Parse a count that must be at least 1, such as --workers
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a whole number, got {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+def setup_logging():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('scraper.log', encoding='utf-8'),
+            logging.StreamHandler()
+        ]
+    )
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Find and scrape contact details for a list of firms")
+    parser.add_argument("--input", default=config.INPUT_PATH,
+                        help=f"CSV (or Excel, without --stream) file with the list of firms (default: {config.INPUT_PATH})")
+    parser.add_argument("--output",
+                        help=f"output file (default: {config.OUTPUT_PATH}, or {config.STREAM_OUTPUT_PATH} with --stream)")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip firms already in the journal and rebuild the workbook from it")
+    parser.add_argument("--journal", default=config.JOURNAL_PATH,
+                        help=f"journal of completed firms (default: {config.JOURNAL_PATH})")
+    parser.add_argument("--workers", "--concurrency", dest="workers", type=positive_int, default=config.MAX_WORKERS,
+                        help=f"number of firms enriched in parallel (default: {config.MAX_WORKERS})")
+    parser.add_argument("--stream", action="store_true",
+                        help="read and write in chunks to keep memory bounded (output: .csv, .jsonl or .parquet)")
+    parser.add_argument("--chunk-size", type=positive_int, default=config.STREAM_CHUNK_SIZE,
+                        help=f"rows per chunk in --stream mode (default: {config.STREAM_CHUNK_SIZE})")
+    parser.add_argument("--metrics",
+                        help="write run metrics to this file (.prom/.txt = Prometheus text format, otherwise JSON)")
+    parser.add_argument("--no-dedup", dest="dedup", action="store_false", default=config.DEDUP_ENABLED,
+                        help="enrich every row, even when it duplicates another firm")
+    parser.add_argument("--sources", type=parse_sources, default=config.SOURCES,
+                        help=f"comma-separated sources to search (default: {','.join(config.SOURCES)})")
+    parser.add_argument("--adaptive", action="store_true", default=config.ADAPTIVE_SOURCES,
+                        help="query sources cheapest first and stop once the required fields are found")
+    parser.add_argument("--refresh", action="store_true",
+                        help="re-enrich a previous output: only fetch fields that are missing, invalid or older than --max-age-days")
+    parser.add_argument("--max-age-days", type=float, default=config.REFRESH_MAX_AGE_DAYS,
+                        help=f"with --refresh, fields verified longer ago than this are re-fetched (default: {config.REFRESH_MAX_AGE_DAYS})")
+    parser.add_argument("--refine-batch-size", type=int, default=config.REFINE_BATCH_SIZE,
+                        help=f"firms refined per Gemini call (default: {config.REFINE_BATCH_SIZE})")
+    queue = parser.add_argument_group("distributed runs", "share the work between worker processes on one host through a work queue file")
+    queue.add_argument("--queue",
+                       help="SQLite work queue file on a local disk shared by the workers")
+    queue.add_argument("--enqueue", action="store_true",
+                       help="add the --input firms to the queue (coordinator)")
+    queue.add_argument("--work", action="store_true",
+                       help="enrich firms from the queue until none are left (worker)")
+    queue.add_argument("--wait", action="store_true",
+                       help="with --work, keep polling for new firms instead of exiting")
+    queue.add_argument("--collect", action="store_true",
+                       help="write the queue's results to --output")
+    queue.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}",
+                       help="name this worker uses for its leases (default: host-pid)")
+    args = parser.parse_args(argv)
+    if (args.enqueue or args.work or args.collect) and not args.queue:
+        parser.error("--enqueue, --work and --collect need --queue")
+    return args
+
+def collect_results(queue, output_path, chunk_size):
+    """
+    Write every queued firm with its updates, in the order they were enqueued.
+    Excel output is built in memory; .csv, .jsonl and .parquet are streamed.
+    """
+    import pandas as pd
+    
+    def frames():
+        records = []
+        for row, updates in queue.results():
+            row.update(updates)
+            records.append(row)
+            if len(records) >= chunk_size:
+                yield pd.DataFrame(records)
+                records = []
+        if records:
+            yield pd.DataFrame(records)
+    
+    if os.path.splitext(output_path)[1].lower() not in ResultSink.FORMATS:
+        save_results(pd.concat(list(frames()), ignore_index=True), output_path)
+        return
+    sink = ResultSink(output_path)
+    try:
+        for df in frames():
+            sink.write(df)
+    finally:
+        sink.close()
+    print(f"✅ {sink.rows_written} queued firms written to '{output_path}'")
+
+def run_queue(args, enricher):
+    """
+    Coordinator and worker steps of a distributed run
+    """
+    queue = WorkQueue(args.queue)
+    try:
+        if args.enqueue:
+            existing = sum(queue.counts().values())
+            if existing:
+                print(f"⚠️ '{args.queue}' already holds {existing} firms; adding the input again")
+            total = 0
+            for chunk in read_csv_chunks(args.input, args.chunk_size):
+                total += queue.enqueue(prepare_firms(chunk))
+            print(f"📥 Queued {total} firms from '{args.input}' in '{args.queue}'")
+        if args.work:
+            # Rate limits and budgets count the calls of every worker on this queue
+            limits.shared_quota = queue
+            try:
+                enricher.enrich_queue(queue, args.worker_id, wait=args.wait)
+            finally:
+                limits.shared_quota = None
+        if args.collect:
+            collect_results(queue, args.output or config.OUTPUT_PATH, args.chunk_size)
+        counts = queue.counts()
+        print(f"📋 Queue: {counts['pending']} pending, {counts['leased']} leased, {counts['done']} done, {counts['failed']} failed")
+    finally:
+        queue.close()
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_logging()
+    
+    enricher = Enricher(
+        sources=args.sources,
+        adaptive=args.adaptive,
+        refine_batch_size=args.refine_batch_size,
+        dedup=args.dedup,
+        max_workers=args.workers,
+        refresh=args.refresh,
+        max_age_days=args.max_age_days
+    )
+    if args.refine_batch_size > args.workers:
+        print(f"⚠️ --refine-batch-size {args.refine_batch_size} is larger than --workers {args.workers}; "
+              f"batches will be sent after {config.REFINE_BATCH_MAX_WAIT}s without filling up")
+    
+    if args.queue:
+        try:
+            run_queue(args, enricher)
+        finally:
+            enricher.report()
+            metrics.summary()
+            if args.metrics:
+                metrics.export(args.metrics)
+        return
+    
+    completed = {}
+    if args.resume:
+        completed = FirmJournal.load(args.journal)
+        print(f"📒 Loaded {len(completed)} completed firms from '{args.journal}'")
+    
+    journal = FirmJournal(args.journal, fresh=not args.resume)
+    if journal.rotated_path:
+        print(f"📒 Starting a new journal at '{args.journal}'; the previous one was kept as '{journal.rotated_path}' (use --resume to continue a run)")
+    try:
+        if args.stream:
+            enricher.enrich_stream(
+                args.input,
+                args.output or config.STREAM_OUTPUT_PATH,
+                chunk_size=args.chunk_size,
+                journal=journal,
+                completed=completed
+            )
+            return
+        
+        # Load your list of firms
+        df = load_firms(args.input)
+        df = enricher.enrich_dataframe(df, journal=journal, completed=completed)
+    finally:
+        journal.close()
+        enricher.report()
+        metrics.summary()
+        if args.metrics:
+            metrics.export(args.metrics)
+    
+    save_results(df, args.output or config.OUTPUT_PATH)
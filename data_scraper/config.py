@@ -0,0 +1,153 @@
+"""
+Settings for the firm enrichment pipeline.
+Modules read these as config.NAME at call time, and shared objects (HTTP
+sessions, rate limiters, the crawler, caches) are built from them on first
+use, so a caller can change them after import (e.g. config.CACHE_ENABLED = False)
+before a run.
+"""
+import os
+
+# Gemini API - replace with your API key or set GEMINI_API_KEY
+GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "YOUR_GEMINI_API_KEY_HERE")
+GEMINI_MODEL_NAME = "gemini-1.5-flash"
+GEMINI_STRUCTURED_OUTPUT = True     # Ask for schema-constrained JSON (needs a model that supports response_schema)
+GEMINI_JSON_REPAIR_RETRIES = 1      # Cheap repair round trips for a malformed JSON answer
+
+
+# Tavily API - replace with your API key or set TAVILY_API_KEY
+TAVILY_API_KEY = os.environ.get("TAVILY_API_KEY", "YOUR_TAVILY_API_KEY_HERE")
+
+# SERP API - replace with your API key or set SERP_API_KEY
+SERP_API_KEY = os.environ.get("SERP_API_KEY", "YOUR_SERP_API_KEY_HERE")
+SERP_API_URL = "https://serpapi.com/search"
+
+# HTTP client - URL checks and website crawling, and (without 429/POST retries) the SERP API and Tavily
+HTTP_TIMEOUT = (5, 15)          # (connect, read) seconds
+HTTP_RETRIES = 3                # Retries on connection errors and 429/5xx responses
+HTTP_BACKOFF_FACTOR = 0.5       # Exponential backoff: 0.5s, 1s, 2s, ...
+HTTP_BACKOFF_JITTER = 0.5       # Random extra delay (seconds) added to each backoff
+HTTP_POOL_CONNECTIONS = 64      # Number of hosts kept in the connection pool
+HTTP_POOL_MAXSIZE = 16          # Keep-alive connections per host
+HTTP_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+# Concurrency - number of firms enriched in parallel (1 = serial)
+MAX_WORKERS = 8
+
+# Per-source timeouts (seconds) for the parallel Gemini/Tavily/SERP fan-out
+SOURCE_TIMEOUTS = {
+    "gemini": 60,
+    "tavily": 120,
+    "serp": 30
+}
+
+# Sources queried for each firm that has no website (--sources narrows this per run)
+SOURCES = ["gemini", "tavily", "serp"]
+
+# Adaptive (cost-aware) source orchestration - off by default, enable with --adaptive
+ADAPTIVE_SOURCES = False
+SOURCE_ORDER = ["gemini", "serp", "tavily"]     # Sources tried one at a time, cheapest first
+SOURCE_COSTS = {                                # Estimated USD per call, used for the cost report
+    "gemini": 0.001,
+    "serp": 0.015,
+    "tavily": 0.12,     # A full run of TAVILY_MAX_QUERIES advanced searches
+    "refine": 0.002
+}
+SOURCE_CONFIDENCE = {                           # How much a field reported by one source is trusted (0-1)
+    "gemini": 0.5,
+    "serp": 0.8,
+    "tavily": 0.6
+}
+ADAPTIVE_REQUIRED_FIELDS = ["website", "phone", "address"]  # Stop querying once these are found...
+ADAPTIVE_MIN_CONFIDENCE = 0.75                              # ...with at least this confidence
+
+# Tavily query settings
+TAVILY_MAX_QUERIES = 15      # Max queries sent per firm
+TAVILY_MAX_IN_FLIGHT = 4     # Max concurrent Tavily queries per firm
+TAVILY_STOP_EARLY = True     # Stop sending queries once the fields below are filled
+TAVILY_STOP_EARLY_FIELDS = ["website", "email", "phone", "facebook", "instagram", "linkedin", "address"]
+
+# Gemini refinement batching
+REFINE_BATCH_SIZE = 1        # Firms refined per Gemini call (1 = one call per firm); keep <= MAX_WORKERS
+REFINE_BATCH_MAX_WAIT = 5.0  # Seconds to wait for a batch to fill before sending it anyway
+
+# Response cache - reruns reuse Gemini/Tavily/SERP answers instead of paying again
+CACHE_ENABLED = True
+CACHE_PATH = "scraper_cache.sqlite"
+CACHE_TTL_SECONDS = 7 * 24 * 3600   # Entries older than this are refetched
+CACHE_MAX_ENTRIES = 50000           # Least recently used entries are evicted beyond this
+
+# Per-provider rate limits and per-run call budgets (None = no limit)
+RATE_LIMITS = {
+    "gemini": {"per_second": 2, "per_minute": 60, "per_day": 1500, "budget": None},
+    "tavily": {"per_second": 5, "per_minute": 100, "per_day": None, "budget": None},
+    "serp": {"per_second": 2, "per_minute": 60, "per_day": None, "budget": None}
+}
+RATE_LIMIT_MAX_WAIT = 300       # Skip a call (degrade) rather than wait longer than this, in seconds
+RATE_LIMIT_429_RETRIES = 2      # Retries after a provider answers 429, with adaptive slow-down
+
+# URL validation - verdicts are cached per URL for this long
+URL_CHECK_TTL_SECONDS = 24 * 3600
+URL_CHECK_MEMORY_ENTRIES = 20000     # Verdicts kept in memory (least recently used dropped); the response cache keeps the rest
+
+# Website crawler
+CRAWL_MAX_CONCURRENCY = 32  # Pages fetched at once across all sites
+CRAWL_PER_HOST_LIMIT = 2    # Pages fetched at once from the same host
+CRAWL_HOST_DELAY = 0.5      # Minimum seconds between requests to the same host
+CRAWL_MAX_DEPTH = 1         # 0 = homepage only, 1 = + contact/about/team pages, 2 = + their links
+CRAWL_MAX_PAGES = 6         # Page budget per site
+CRAWL_LINK_SCORES = {       # Which links are followed, best first (matched against the URL path)
+    "contact": 3,
+    "about": 2,
+    "team": 1
+}
+CRAWL_FRONTIER_SIZE = 20    # Best-scoring candidate links kept per site; the rest are dropped
+CRAWL_STOP_EARLY = True     # Stop crawling a site once a valid email and phone have been found
+CRAWL_MAX_PAGE_BYTES = 2 * 1024 * 1024      # Bytes read per page; larger pages are cut off
+CRAWL_MAX_SITE_BYTES = 6 * 1024 * 1024      # Bytes downloaded per site before the crawl stops
+CRAWL_READ_CHUNK_BYTES = 64 * 1024          # Pages are streamed in chunks of this size
+CRAWL_CONTENT_TYPES = ("text/html", "application/xhtml+xml")    # Other content types (PDFs, images) are not downloaded
+
+# Page store - crawled pages kept compressed so later runs send conditional requests (ETag/Last-Modified)
+PAGE_STORE_ENABLED = True
+PAGE_STORE_PATH = "scraper_pages.sqlite"
+PAGE_STORE_MAX_AGE_SECONDS = 90 * 24 * 3600     # Pages not fetched for this long are dropped
+
+# Deduplication - firms that are the same entity are enriched once
+DEDUP_ENABLED = True
+DEDUP_NAME_THRESHOLD = 0.9      # Minimum difflib similarity of normalized company names
+DEDUP_TOKEN_THRESHOLD = 0.85    # Names are also compared word by word: long words may differ by a typo within this similarity
+DEDUP_FUZZY_TOKEN_LENGTH = 5    # Shorter words and initials must match exactly
+DEDUP_ACROSS_LOCATIONS = False  # Also merge same-name firms in different locations (the same website merges anyway)
+DEDUP_CANDIDATE_GRAMS = 4       # Rarest name trigrams used to look up candidate matches
+DEDUP_MAX_BUCKET = 200          # Beyond the rarest trigram, skip trigrams shared by more entities than this
+DEDUP_MAX_ENTITIES = 200000     # In --stream mode the index is emptied between chunks beyond this many entities, bounding memory
+DEDUP_DOMAIN_NAME_THRESHOLD = 0.6   # Firms on the same website must still have names at least this similar
+# Social, directory and site-builder hosts shared by many firms: a website here identifies the firm by its full URL, not the domain
+DEDUP_SHARED_DOMAINS = {
+    "facebook.com", "fb.com", "instagram.com", "linkedin.com", "twitter.com", "x.com", "youtube.com",
+    "justdial.com", "indiamart.com", "sulekha.com", "tradeindia.com", "exportersindia.com", "yellowpages.in",
+    "google.com", "g.page", "goo.gl", "wa.me", "linktr.ee", "business.site", "wixsite.com", "blogspot.com",
+    "wordpress.com", "github.io", "weebly.com", "godaddysites.com"
+}
+
+# Metrics - latency histogram buckets (seconds) and samples kept per stage for the p50/p95 summary
+METRICS_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+METRICS_MAX_SAMPLES = 10000
+
+# Distributed work queue (--queue) - a SQLite file shared by the coordinator and all workers on one host
+QUEUE_LEASE_SECONDS = 600   # A firm not finished (or renewed) within this is handed to another worker
+QUEUE_MAX_ATTEMPTS = 3      # Leases per firm before it is marked failed
+QUEUE_POLL_SECONDS = 5      # How often an idle worker checks for new or expired jobs
+
+# Incremental refresh (--refresh) - per-field source and last-verified time are kept in this column
+PROVENANCE_COLUMN = "Provenance"
+REFRESH_MAX_AGE_DAYS = 30   # Fields verified longer ago than this are re-fetched
+
+# Journal of completed firms - one JSON line per firm, used by --resume
+JOURNAL_PATH = "scraper_journal.jsonl"
+
+# Input/output
+INPUT_PATH = "firms.csv"
+OUTPUT_PATH = "interior_firm_contacts.xlsx"
+STREAM_OUTPUT_PATH = "interior_firm_contacts.csv"
+STREAM_CHUNK_SIZE = 500     # Rows read, enriched and written per chunk in --stream mode
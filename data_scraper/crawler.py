@@ -0,0 +1,343 @@
+"""
+Concurrent website crawler with per-host limits
+"""
+import asyncio
+import hashlib
+import heapq
+import itertools
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from . import config
+from .extract import clean_contacts, clean_page_text, contact_extractor, extract_social_links, get_internal_links, normalize_url, parse_page
+from .http_client import http_get
+from .metrics import metrics, timed_stage
+from .pagestore import get_page_store
+
+logger = logging.getLogger(__name__)
+
+# Bump when parse_and_extract changes, so pages stored by an older version are parsed again
+PARSE_VERSION = 3
+
+def current_parse(parsed):
+    """
+    A stored parsed page, or None if it was made by an older parse_and_extract
+    """
+    return parsed if parsed is not None and parsed.get("version") == PARSE_VERSION else None
+
+# charset declared in the first bytes of a page, for servers that leave it out of Content-Type
+META_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+def decode_html(content, content_type):
+    """
+    Decode a page body using the charset from the Content-Type header, then
+    a <meta charset> near the top of the page, then UTF-8
+    """
+    encoding = None
+    for param in content_type.split(";")[1:]:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "charset":
+            encoding = value.strip().strip('"\'')
+    if not encoding:
+        match = META_CHARSET_PATTERN.search(content[:4096])
+        encoding = match.group(1).decode("ascii") if match else "utf-8"
+    try:
+        return content.decode(encoding, errors="replace")
+    except LookupError:
+        return content.decode("utf-8", errors="replace")
+
+class SiteCrawler:
+    """
+    Asyncio crawl engine shared by all worker threads.
+    The event loop runs on a background thread so many firms' sites are
+    crawled at once. Fetches are capped globally and per host, with a
+    minimum delay between requests to the same host. Pages are fetched
+    through the pooled HTTP session on a thread pool.
+    """
+    
+    def __init__(self, max_concurrency=None, per_host_limit=None, host_delay=None):
+        self.max_concurrency = max_concurrency if max_concurrency is not None else config.CRAWL_MAX_CONCURRENCY
+        self.per_host_limit = per_host_limit if per_host_limit is not None else config.CRAWL_PER_HOST_LIMIT
+        self.host_delay = host_delay if host_delay is not None else config.CRAWL_HOST_DELAY
+        self.executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="crawl")
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_default_executor(self.executor)
+        self.thread = threading.Thread(target=self.loop.run_forever, name="crawler", daemon=True)
+        self.thread.start()
+        # Created lazily on the loop thread
+        self.global_limit = None
+        self.host_limits = {}
+        self.host_last_request = {}
+        # Fetches in progress or waiting per host; idle hosts are pruned from the dicts above
+        self.host_active = {}
+    
+    @timed_stage("crawl")
+    def crawl(self, url, max_depth=None, max_pages=None):
+        """
+        Crawl one site from any thread and block until it is done
+        (depth and page limits default to CRAWL_MAX_DEPTH and CRAWL_MAX_PAGES)
+        """
+        max_depth = max_depth if max_depth is not None else config.CRAWL_MAX_DEPTH
+        max_pages = max_pages if max_pages is not None else config.CRAWL_MAX_PAGES
+        return asyncio.run_coroutine_threadsafe(self.crawl_site(url, max_depth, max_pages), self.loop).result()
+    
+    async def wait_for_host(self, host):
+        """
+        Sleep until host_delay has passed since the last request to this host.
+        The slot is reserved before sleeping, so requests waiting together
+        are spaced out rather than all released at once.
+        """
+        now = time.monotonic()
+        slot = max(now, self.host_last_request.get(host, 0) + self.host_delay)
+        self.host_last_request[host] = slot
+        if slot > now:
+            await asyncio.sleep(slot - now)
+    
+    def prune_hosts(self):
+        """
+        Forget hosts with no fetch in progress whose delay has passed, so the
+        per-host state does not grow with the number of sites crawled
+        """
+        now = time.monotonic()
+        idle = [
+            host for host in set(self.host_limits) | set(self.host_last_request)
+            if host not in self.host_active and now >= self.host_last_request.get(host, 0) + self.host_delay
+        ]
+        for host in idle:
+            self.host_last_request.pop(host, None)
+            self.host_limits.pop(host, None)
+    
+    async def fetch_page(self, url, depth, max_bytes):
+        """
+        Fetch one page, reading at most max_bytes of its body, and return
+        (fetch report, html or None, stored parsed page or None).
+        A page in the page store is fetched conditionally; the stored parsed page
+        is returned when the server answers 304 or the content hash is unchanged.
+        """
+        if self.global_limit is None:
+            self.global_limit = asyncio.Semaphore(self.max_concurrency)
+        host = urlparse(url).netloc.lower()
+        host_limit = self.host_limits.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+        self.host_active[host] = self.host_active.get(host, 0) + 1
+        
+        report = {"url": url, "final_url": url, "depth": depth, "status": None, "bytes": 0, "error": None,
+                  "content_hash": None, "truncated": False}
+        html = None
+        parsed = None
+        # Take the host slot first so a busy host does not hold global slots while it waits
+        try:
+            async with host_limit:
+                async with self.global_limit:
+                    await self.wait_for_host(host)
+                    try:
+                        html, parsed = await self.loop.run_in_executor(None, self.fetch_with_store, url, report, max_bytes)
+                    except Exception as e:
+                        report["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            self.host_active[host] -= 1
+            if not self.host_active[host]:
+                del self.host_active[host]
+            self.prune_hosts()
+        metrics.increment("crawl_pages_total", result="error" if report["error"] else "ok")
+        if report["error"]:
+            metrics.increment("crawl_page_errors_total", kind=str(report["status"] or "connection"))
+        return report, html, parsed
+    
+    def fetch_with_store(self, url, report, max_bytes):
+        """
+        GET a page (on an executor thread), revalidating a stored copy with
+        If-None-Match/If-Modified-Since. Fills in the report and returns (html, parsed).
+        """
+        store = get_page_store()
+        stored = store.get(url) if store is not None else None
+        headers = {}
+        if stored is not None:
+            if stored["etag"]:
+                headers["If-None-Match"] = stored["etag"]
+            if stored["last_modified"]:
+                headers["If-Modified-Since"] = stored["last_modified"]
+        
+        # Streamed, so the body is only read once the status and content type are acceptable
+        response = http_get(url, headers=headers, stream=True)
+        try:
+            content = self.read_body(response, report, max_bytes)
+        finally:
+            response.close()
+        report["bytes"] = len(content or b"")
+        metrics.increment("bytes_downloaded_total", report["bytes"], source="crawl")
+        
+        if response.status_code == 304 and stored is not None:
+            metrics.increment("page_store_total", result="not_modified")
+            store.touch(url)
+            report["final_url"] = stored["final_url"]
+            report["content_hash"] = stored["content_hash"]
+            return stored["body"].decode("utf-8"), current_parse(stored["parsed"])
+        if content is None:
+            return None, None
+        
+        html = decode_html(content, response.headers.get("Content-Type", ""))
+        content_hash = hashlib.sha256(content).hexdigest()
+        report["content_hash"] = content_hash
+        parsed = None
+        if stored is not None and stored["content_hash"] == content_hash:
+            # Same bytes as last time: keep the parsed page, refresh the validators
+            metrics.increment("page_store_total", result="unchanged")
+            parsed = current_parse(stored["parsed"])
+        else:
+            metrics.increment("page_store_total", result="changed" if stored is not None else "new")
+        if store is not None:
+            store.put(url, response.url, response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                      content_hash, html.encode("utf-8"), parsed)
+        return html, parsed
+    
+    def read_body(self, response, report, max_bytes):
+        """
+        Read a streamed response body in chunks, up to max_bytes.
+        Returns None (with report["error"] set) for an error status or a
+        non-HTML content type, without downloading the body.
+        """
+        report["status"] = response.status_code
+        report["final_url"] = response.url
+        if response.status_code == 304:
+            return b""
+        if response.status_code >= 400:
+            report["error"] = f"HTTP {response.status_code}"
+            return None
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type and content_type not in config.CRAWL_CONTENT_TYPES:
+            report["error"] = f"Skipped {content_type} content"
+            metrics.increment("crawl_pages_skipped_total", reason="content_type")
+            return None
+        
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(chunk_size=config.CRAWL_READ_CHUNK_BYTES):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= max_bytes:
+                # Keep the start of the page; lxml copes with the cut-off markup
+                report["truncated"] = True
+                metrics.increment("crawl_pages_truncated_total")
+                logger.info(f"Page {response.url} cut off at {max_bytes} bytes")
+                break
+        return b"".join(chunks)[:max_bytes]
+    
+    def parse_and_extract(self, url, html, report):
+        """
+        Parse a page and extract its contacts (on an executor thread), saving
+        the result in the page store for the next run. Structured contacts
+        (mailto:/tel: links, JSON-LD, microdata) are used first; the page text
+        is regex-scanned only for the kinds they did not provide.
+        """
+        page = parse_page(html, report["final_url"])
+        structured = page["structured"]
+        contacts = {}
+        scanned = None
+        for kind in ("emails", "phones"):
+            if structured[kind]:
+                contacts[kind], source = structured[kind], "structured"
+            else:
+                scanned = scanned or contact_extractor.scan(clean_page_text(page["text"]))
+                contacts[kind], source = scanned[kind], "text"
+            metrics.increment("crawl_contacts_total", len(contacts[kind]), kind=kind, source=source)
+        page["contacts"] = contacts
+        # Profiles listed in JSON-LD/microdata sameAs fill networks the links did not
+        for network, link in extract_social_links(structured["socials"]).items():
+            if link and not page["socials"][network]:
+                page["socials"][network] = link
+        page["version"] = PARSE_VERSION
+        # The text has been reduced to contacts; don't keep (or store) it
+        del page["text"]
+        store = get_page_store()
+        if store is not None and report["content_hash"]:
+            store.set_parsed(url, report["content_hash"], page)
+        return page
+    
+    async def crawl_site(self, url, max_depth, max_pages):
+        """
+        Crawl one site from its homepage through a bounded frontier of
+        contact/about/team links on the same registrable domain, best-scoring
+        first, following links up to max_depth and fetching at most max_pages
+        pages. With CRAWL_STOP_EARLY, stops once a valid email and phone are found.
+        Downloads stop once the site has used CRAWL_MAX_SITE_BYTES. Each page's
+        text is reduced to its contacts as soon as it is parsed, so memory does
+        not grow with the number or size of pages.
+        Returns {"pages": [fetch reports], "socials": {...},
+        "contacts": {"emails": [...], "phones": [...]}} with contacts in page order.
+        """
+        result = {"pages": [], "socials": {"Facebook": "", "Instagram": "", "LinkedIn": ""}}
+        site_bytes = 0
+        emails = {}
+        phones = {}
+        seen = {normalize_url(url, url) or url}
+        # Frontier entries are (-score, depth, order, url): best score first, then shallowest, then first seen
+        frontier = [(0, 0, 0, url)]
+        order = itertools.count(1)
+        while frontier and len(result["pages"]) < max_pages:
+            if site_bytes >= config.CRAWL_MAX_SITE_BYTES:
+                metrics.increment("crawl_pages_skipped_total", len(frontier), reason="site_bytes")
+                logger.info(f"Crawl of {url} stopped: {site_bytes} bytes downloaded")
+                break
+            # Fetch a few pages at a time so the crawl can stop between batches
+            batch_size = min(self.per_host_limit, max_pages - len(result["pages"]))
+            batch = [heapq.heappop(frontier) for _ in range(min(batch_size, len(frontier)))]
+            # Split what is left of the site budget between the pages fetched together
+            page_bytes = min(config.CRAWL_MAX_PAGE_BYTES, (config.CRAWL_MAX_SITE_BYTES - site_bytes) // len(batch))
+            fetched = await asyncio.gather(*(self.fetch_page(link, depth, page_bytes) for _, depth, _, link in batch))
+            
+            for report, html, page in fetched:
+                result["pages"].append(report)
+                site_bytes += report["bytes"]
+                if html is None:
+                    continue
+                if page is None:
+                    # Parse off the event loop so slow pages do not stall other sites
+                    try:
+                        page = await self.loop.run_in_executor(None, self.parse_and_extract, report["url"], html, report)
+                    except Exception as e:
+                        # Report the page as failed and carry on with the rest of the site
+                        report["error"] = f"Parse failed: {type(e).__name__}: {e}"
+                        metrics.increment("crawl_page_errors_total", kind="parse")
+                        continue
+                if report["depth"] == 0:
+                    # Social links from homepage
+                    result["socials"] = page["socials"]
+                # Dicts keep first-seen order while dropping duplicates
+                emails.update(dict.fromkeys(page["contacts"]["emails"]))
+                phones.update(dict.fromkeys(page["contacts"]["phones"]))
+                if report["depth"] < max_depth:
+                    for score, link in get_internal_links(page["links"], report["final_url"]):
+                        if link not in seen:
+                            seen.add(link)
+                            heapq.heappush(frontier, (-score, report["depth"] + 1, next(order), link))
+            
+            # Keep only the best candidates
+            if len(frontier) > config.CRAWL_FRONTIER_SIZE:
+                frontier = heapq.nsmallest(config.CRAWL_FRONTIER_SIZE, frontier)
+                heapq.heapify(frontier)
+            if config.CRAWL_STOP_EARLY and frontier:
+                valid_emails, valid_phones = clean_contacts(list(emails), list(phones))
+                if valid_emails and valid_phones:
+                    metrics.increment("crawl_stopped_early_total")
+                    logger.info(f"Crawl of {url} stopped after {len(result['pages'])} pages: email and phone found")
+                    break
+        result["contacts"] = {"emails": list(emails), "phones": list(phones)}
+        return result
+
+# Started on first use, so importing the package does not start the crawler thread
+site_crawler = None
+site_crawler_lock = threading.Lock()
+
+def get_site_crawler():
+    """
+    Return the shared crawler, starting it on first use
+    """
+    global site_crawler
+    with site_crawler_lock:
+        if site_crawler is None:
+            site_crawler = SiteCrawler()
+    return site_crawler
@@ -0,0 +1,234 @@
+"""
+Detect firms that are the same entity so each is enriched once
+"""
+import difflib
+import re
+from urllib.parse import urlparse
+
+from . import config
+from .validation import is_missing, normalize_domain
+
+# Legal and filler words dropped when comparing company names
+COMPANY_NAME_STOPWORDS = {
+    "the", "and", "pvt", "private", "ltd", "limited", "llp", "inc", "co", "company",
+    "corp", "corporation", "india", "opc"
+}
+NAME_PUNCTUATION_PATTERN = re.compile(r"[^\w\s]")
+NUMBER_PATTERN = re.compile(r"\d+")
+# "M/s." / "Messrs" in front of a firm's name
+MESSRS_PATTERN = re.compile(r"^\s*(?:m\s*/\s*s\b|messrs\b)\.?", re.IGNORECASE)
+
+def normalize_company_name(name):
+    """
+    Normalize a company name for duplicate detection ("M/s. Royal Interiors Pvt. Ltd." -> "royal interiors")
+    """
+    if is_missing(name):
+        return ""
+    name = MESSRS_PATTERN.sub(" ", str(name))
+    name = NAME_PUNCTUATION_PATTERN.sub(" ", name.lower().replace("&", " and "))
+    return " ".join(token for token in name.split() if token not in COMPANY_NAME_STOPWORDS)
+
+def tokens_match(token, other):
+    """
+    Whether two name words are the same: short words and initials must be
+    equal (up to a plural "s"), only words of DEDUP_FUZZY_TOKEN_LENGTH or more
+    may differ by a typo (within DEDUP_TOKEN_THRESHOLD)
+    """
+    if token == other:
+        return True
+    if min(len(token), len(other)) < config.DEDUP_FUZZY_TOKEN_LENGTH:
+        return len(token) > 3 and len(other) > 3 and token.rstrip("s") == other.rstrip("s")
+    return difflib.SequenceMatcher(None, token, other).ratio() >= config.DEDUP_TOKEN_THRESHOLD
+
+def names_match(name, other):
+    """
+    Whether two normalized names are the same firm, compared word by word:
+    "a r interiors" and "a k interiors" or "arun" and "varun" never match
+    """
+    words, other_words = name.split(), other.split()
+    return len(words) == len(other_words) and all(tokens_match(a, b) for a, b in zip(words, other_words))
+
+def normalize_location(location):
+    """
+    Normalize a location for duplicate detection
+    """
+    if is_missing(location):
+        return ""
+    return " ".join(NAME_PUNCTUATION_PATTERN.sub(" ", str(location).lower()).split())
+
+def name_trigrams(name):
+    """
+    Set of character trigrams of a normalized name, used by the fuzzy index
+    """
+    padded = f" {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def firm_domain(row):
+    """
+    Normalized website domain of a firm, or "" if it has no website
+    """
+    website = row.get("Website", "")
+    if is_missing(website) or not str(website).strip():
+        return ""
+    return normalize_domain(str(website).strip())
+
+def is_shared_domain(domain):
+    """
+    True for social, directory and site-builder hosts (config.DEDUP_SHARED_DOMAINS) that many firms share
+    """
+    host = domain.split(":")[0]
+    return any(host == shared or host.endswith("." + shared) for shared in config.DEDUP_SHARED_DOMAINS)
+
+def firm_site(row):
+    """
+    What identifies a firm's website for duplicate detection: the domain of
+    its own site, or the full host and path of a page on a shared host
+    ("facebook.com/royalinteriors"), or "" if it has no website
+    """
+    domain = firm_domain(row)
+    if not domain or not is_shared_domain(domain):
+        return domain
+    website = str(row.get("Website")).strip()
+    parsed = urlparse(website if website.startswith(('http://', 'https://')) else 'https://' + website)
+    site = domain + parsed.path.rstrip("/").lower()
+    return f"{site}?{parsed.query}" if parsed.query else site
+
+def names_compatible(name, other):
+    """
+    Whether two firms on the same website can be the same entity: no
+    conflicting branch numbers, and one name contains the other's words or
+    they match within DEDUP_DOMAIN_NAME_THRESHOLD
+    """
+    if not name or not other:
+        return True
+    if NUMBER_PATTERN.findall(name) != NUMBER_PATTERN.findall(other):
+        return False
+    words, other_words = set(name.split()), set(other.split())
+    if words <= other_words or other_words <= words:
+        return True
+    return difflib.SequenceMatcher(None, name, other).ratio() >= config.DEDUP_DOMAIN_NAME_THRESHOLD
+
+class EntityIndex:
+    """
+    Groups firms that are the same entity: the same website (and a
+    compatible name), or a company name in the same location that matches within
+    DEDUP_NAME_THRESHOLD after normalization. Candidates are looked up in an
+    inverted index of name trigrams, so each firm is compared with a few
+    similar names rather than every firm seen so far.
+    Enrichment results are kept per entity, so later chunks of a streamed
+    input reuse them too. Only what a duplicate needs is kept (the updates
+    and the website), and the index is emptied between chunks once it holds
+    more than max_entities, so memory stays bounded on inputs of any size.
+    """
+
+    def __init__(self, threshold=None, across_locations=None, max_entities=None):
+        self.threshold = threshold if threshold is not None else config.DEDUP_NAME_THRESHOLD
+        self.across_locations = across_locations if across_locations is not None else config.DEDUP_ACROSS_LOCATIONS
+        self.max_entities = max_entities if max_entities is not None else config.DEDUP_MAX_ENTITIES
+        self.entities = []
+        self.by_domain = {}
+        self.by_name = {}
+        self.by_gram = {}
+
+    def match(self, row):
+        """
+        Return the entity id for a firm, adding a new entity if nothing matches
+        """
+        name = normalize_company_name(row.get("Company Name", ""))
+        block = "" if self.across_locations else normalize_location(row.get("Location", ""))
+        domain = firm_site(row)
+        
+        entity_id = self.by_domain.get(domain) if domain else None
+        if entity_id is not None and not names_compatible(name, self.entities[entity_id]["name"]):
+            entity_id = None
+        if entity_id is None and name:
+            entity_id = self.find_similar(name, block, domain)
+        
+        if entity_id is None:
+            entity_id = len(self.entities)
+            self.entities.append({"name": name, "domain": domain, "numbers": NUMBER_PATTERN.findall(name), "result": None})
+            self.by_name.setdefault((block, name), entity_id)
+            for gram in name_trigrams(name):
+                self.by_gram.setdefault((block, gram), []).append(entity_id)
+        elif domain and not self.entities[entity_id]["domain"]:
+            self.entities[entity_id]["domain"] = domain
+        
+        if domain:
+            self.by_domain.setdefault(domain, entity_id)
+        return entity_id
+
+    def find_similar(self, name, block, domain):
+        """
+        Best matching entity for a normalized name within a location block, or None
+        """
+        exact = self.by_name.get((block, name))
+        if exact is not None and self.domains_compatible(exact, domain):
+            return exact
+        
+        # Look up candidates by the rarest trigrams. Trigrams rather than words,
+        # so a typo only hides the few trigrams it touches; very common trigrams
+        # are only used when the name has nothing rarer
+        buckets = sorted(
+            (bucket for bucket in (self.by_gram.get((block, gram)) for gram in name_trigrams(name)) if bucket),
+            key=len
+        )
+        selected = buckets[:1] + [bucket for bucket in buckets[1:config.DEDUP_CANDIDATE_GRAMS] if len(bucket) <= config.DEDUP_MAX_BUCKET]
+        candidates = set().union(*selected) if selected else set()
+        
+        numbers = NUMBER_PATTERN.findall(name)
+        best_id, best_score = None, self.threshold
+        for entity_id in sorted(candidates):
+            entity = self.entities[entity_id]
+            # Firms with different websites or branch numbers are different entities whatever their names
+            if not self.domains_compatible(entity_id, domain) or entity["numbers"] != numbers:
+                continue
+            # ratio() can't beat 2 * shorter / total length, so skip names of very different length
+            if 2 * min(len(name), len(entity["name"])) < best_score * (len(name) + len(entity["name"])):
+                continue
+            matcher = difflib.SequenceMatcher(None, name, entity["name"])
+            if matcher.quick_ratio() < best_score:
+                continue
+            score = matcher.ratio()
+            if score >= best_score and names_match(name, entity["name"]):
+                best_id, best_score = entity_id, score
+        return best_id
+
+    def domains_compatible(self, entity_id, domain):
+        entity_domain = self.entities[entity_id]["domain"]
+        return not (domain and entity_domain and entity_domain != domain)
+
+    def trim(self):
+        """
+        Forget every entity once there are more than max_entities. Call only
+        between batches: entity ids from earlier match() calls become invalid.
+        """
+        if len(self.entities) > self.max_entities:
+            self.entities = []
+            self.by_domain = {}
+            self.by_name = {}
+            self.by_gram = {}
+            return True
+        return False
+
+    def result(self, entity_id):
+        return self.entities[entity_id]["result"]
+
+    def store(self, entity_id, row, updates, fields=None):
+        """
+        Keep an entity's updates (without provenance) for its later duplicates;
+        `fields` is the set of fields that were refreshed, or None for all.
+        Only the website of the enriched row is kept, not the whole row.
+        """
+        self.entities[entity_id]["result"] = ({"Website": row.get("Website", "")}, updates, fields)
+
+def fan_out_updates(source_row, row, updates):
+    """
+    Updates for a duplicate firm, copied from the firm that was enriched for
+    its entity. A website known for the entity fills a missing one.
+    """
+    updates = dict(updates)
+    if not firm_domain(row):
+        website = updates.get("Website") or source_row.get("Website", "")
+        if not is_missing(website) and str(website).strip():
+            updates["Website"] = str(website).strip()
+    return updates
@@ -0,0 +1,456 @@
+"""
+The Enricher: search, refine and crawl pipeline for firms
+"""
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait as wait_futures
+
+from tqdm import tqdm
+
+from . import config
+from .crawler import get_site_crawler
+from .dedup import EntityIndex, fan_out_updates, firm_domain
+from .extract import clean_contacts
+from .files import ResultSink, prepare_firms, read_csv_chunks
+from .journal import firm_key
+from .limits import count_provider_calls
+from .metrics import metrics, timed_stage
+from .refresh import TRACKED_FIELDS, is_blank, stale_fields, with_provenance
+from .refine import RefinementBatcher, process_refined_data, refine_data_with_gemini
+from .sources import SOURCE_FUNCTIONS, SourceCostTracker, collect_source_data, collect_source_data_adaptive, create_source_executor, validated_from_sources
+from .validation import is_missing, lookup_url_check, store_url_check
+
+logger = logging.getLogger(__name__)
+
+class Enricher:
+    """
+    Finds and scrapes contact details for firms.
+    Firms without a website are searched for with the selected sources and the
+    results refined by Gemini; firms with a website have it crawled. Provider
+    clients are created on first use, so constructing an Enricher is cheap.
+    
+        enricher = Enricher(sources=["gemini", "serp"], max_workers=4)
+        updates = enricher.enrich_firm({"Company Name": "...", "Business Type": "...",
+                                        "Location": "...", "Website": ""})
+    """
+    
+    def __init__(self, sources=None, adaptive=None, refine_batch_size=None, dedup=None, max_workers=None,
+                 refresh=False, max_age_days=None):
+        self.sources = list(config.SOURCES if sources is None else sources)
+        unknown = [name for name in self.sources if name not in SOURCE_FUNCTIONS]
+        if unknown or not self.sources:
+            raise ValueError(f"Unknown sources {unknown} (choose from {', '.join(SOURCE_FUNCTIONS)})")
+        self.adaptive = config.ADAPTIVE_SOURCES if adaptive is None else adaptive
+        self.max_workers = config.MAX_WORKERS if max_workers is None else max_workers
+        # Sized for this Enricher's firms, so a firm's sources do not queue behind other firms'
+        self.source_executor = create_source_executor(self.max_workers)
+        self.batcher = RefinementBatcher(batch_size=refine_batch_size)
+        self.costs = SourceCostTracker()
+        dedup = config.DEDUP_ENABLED if dedup is None else dedup
+        self.entities = EntityIndex() if dedup else None
+        # Refresh mode: only re-fetch fields that are missing, invalid or older than max_age_days
+        self.refresh = refresh
+        self.max_age_days = config.REFRESH_MAX_AGE_DAYS if max_age_days is None else max_age_days
+    
+    def report(self):
+        """
+        Print the estimated source cost report for adaptive runs
+        """
+        if self.adaptive:
+            self.costs.report()
+    
+    def enrich_firm(self, row):
+        """
+        Enrich a single firm and stamp the updated fields with their provenance.
+        In refresh mode, firms with nothing stale are skipped without any calls.
+        Returns a dict of column -> value updates instead of writing to the
+        DataFrame, so it can safely run on a worker thread.
+        """
+        return self.stamp(row, self.fetch_firm(row, self.refresh_fields([row])), row)
+    
+    def refresh_fields(self, rows):
+        """
+        In refresh mode, the fields worth re-fetching for a firm and its
+        duplicates: the union of each row's stale fields. None otherwise.
+        """
+        if not self.refresh:
+            return None
+        return set().union(*(stale_fields(row, self.max_age_days) for row in rows))
+    
+    @timed_stage("firm")
+    def fetch_firm(self, row, stale=None):
+        """
+        Run the pipeline for a firm and return its updates without provenance,
+        or {} without any calls when `stale` (refresh mode) is empty
+        """
+        if stale is not None:
+            if not stale:
+                metrics.increment("refresh_firms_total", result="fresh")
+                return {}
+            metrics.increment("refresh_firms_total", result="refreshed")
+        return self.search_and_crawl(row)
+    
+    def stamp(self, row, updates, source_row):
+        """
+        Stamp updates fetched for source_row (the row itself or the firm its
+        entity was enriched through) onto a row: in refresh mode only the row's
+        own stale fields are kept, and the provenance merged is the row's own
+        """
+        source = "search" if is_blank(source_row.get("Website")) else "crawl"
+        stale = stale_fields(row, self.max_age_days) if self.refresh else None
+        return with_provenance(row, updates, source, stale)
+    
+    def search_and_crawl(self, row):
+        """
+        Run the full search, refine and crawl pipeline for a single firm
+        """
+        updates = {}
+        try:
+            # Check if website is missing or empty
+            if not row['Website'] or is_missing(row['Website']) or row['Website'].strip() == '':
+                print(f"🔍 COMPREHENSIVE SEARCH for: {row['Company Name']} ({row['Business Type']}) in {row['Location']}")
+                print("=" * 80)
+            
+                # Step 1: Collect data from all sources
+                print(f"📊 Step 1: Collecting data from multiple sources...")
+            
+                needs_refinement = True
+                if self.adaptive:
+                    # Cheapest source first, stopping once the required fields are found
+                    print(f"💡 Sources: {', '.join(name for name in config.SOURCE_ORDER if name in self.sources)} in order until required fields are found...")
+                    source_results, merged = collect_source_data_adaptive(
+                        row['Company Name'],
+                        row['Business Type'],
+                        row['Location'],
+                        sources=self.sources,
+                        costs=self.costs,
+                        executor=self.source_executor
+                    )
+                    gemini_result = source_results["gemini"]
+                    tavily_result = source_results["tavily"]
+                    serp_result = source_results["serp"]
+                    # Refinement is only worth paying for when sources disagree
+                    needs_refinement = any(entry["conflict"] for entry in merged.values())
+                else:
+                    # Sources 1-3: Gemini AI, Tavily and SERP API (Google Search) in parallel
+                    print(f"🤖🌐🔍 Sources: {', '.join(self.sources)} searching in parallel...")
+                    gemini_result, tavily_result, serp_result = collect_source_data(
+                        row['Company Name'],
+                        row['Business Type'],
+                        row['Location'],
+                        sources=self.sources,
+                        executor=self.source_executor
+                    )
+            
+                # Step 2: Have Gemini analyze and refine all collected data
+                with count_provider_calls() as refine_calls:
+                    if not needs_refinement:
+                        print(f"🧠 Step 2: No conflicts between sources - skipping Gemini refinement")
+                        validated_data = validated_from_sources(row['Company Name'], merged) if merged else None
+                    elif self.batcher.enabled:
+                        print(f"🧠 Step 2: Gemini analyzing and refining all data sources...")
+                        # Step 3 happens inside the batch: results come back validated
+                        validated_data = self.batcher.refine(
+                            row['Company Name'],
+                            row['Business Type'],
+                            row['Location'],
+                            gemini_result,
+                            tavily_result,
+                            serp_result
+                        )
+                    else:
+                        print(f"🧠 Step 2: Gemini analyzing and refining all data sources...")
+                        refined_result = refine_data_with_gemini(
+                            row['Company Name'], 
+                            row['Business Type'], 
+                            row['Location'],
+                            gemini_result,
+                            tavily_result,
+                            serp_result
+                        )
+                
+                        # Step 3: Process and validate the refined result
+                        print(f"✅ Step 3: Processing and validating refined data...")
+                        validated_data = process_refined_data(
+                            row['Company Name'], 
+                            row['Business Type'], 
+                            row['Location'], 
+                            refined_result
+                        )
+                if self.adaptive and not needs_refinement:
+                    self.costs.record(["refine"], made=False)
+                elif self.adaptive and refine_calls:
+                    # A refinement answered from the cache cost nothing
+                    self.costs.record(["refine"])
+            
+                if validated_data:
+                    found_data = False
+                
+                    # Collect validated data for the DataFrame
+                    if "Website" in validated_data:
+                        updates["Website"] = validated_data["Website"]
+                        found_data = True
+                        print(f"  🌐 Website: {validated_data['Website']}")
+                
+                    if "Email" in validated_data:
+                        updates["Email"] = validated_data["Email"]
+                        found_data = True
+                        print(f"  📧 Email: {validated_data['Email']}")
+                
+                    if "Phone" in validated_data:
+                        updates["Phone"] = validated_data["Phone"]
+                        found_data = True
+                        print(f"  📞 Phone: {validated_data['Phone']}")
+                
+                    if "Facebook" in validated_data:
+                        updates["Facebook"] = validated_data["Facebook"]
+                        found_data = True
+                        print(f"  📘 Facebook: {validated_data['Facebook']}")
+                
+                    if "Instagram" in validated_data:
+                        updates["Instagram"] = validated_data["Instagram"]
+                        found_data = True
+                        print(f"  📷 Instagram: {validated_data['Instagram']}")
+                
+                    if "LinkedIn" in validated_data:
+                        updates["LinkedIn"] = validated_data["LinkedIn"]
+                        found_data = True
+                        print(f"  💼 LinkedIn: {validated_data['LinkedIn']}")
+                
+                    if "Owner" in validated_data:
+                        updates["Founder(s)/Owner(s)/Director(s)"] = validated_data["Owner"]
+                        found_data = True
+                        print(f"  👤 Owner: {validated_data['Owner']}")
+                
+                    if "Address" in validated_data:
+                        found_data = True
+                        print(f"  📍 Address: {validated_data['Address']}")
+                
+                    # The search looked for every tracked field: record the ones it did not
+                    # find as blank, so they are stamped and a refresh does not search again
+                    for field in TRACKED_FIELDS:
+                        if field not in updates and is_blank(row.get(field)):
+                            updates[field] = ""
+                
+                    # Final result summary
+                    if found_data:
+                        print(f"✅ SUCCESS: Found validated data for {row['Company Name']}")
+                        print(f"   📊 Data Quality: {validated_data.get('Data_Quality', 'Unknown')}")
+                        print(f"   📋 Sources Used: {validated_data.get('Sources_Used', 'Unknown')}")
+                        print(f"   🎯 Confidence Score: {validated_data.get('Confidence_Score', '0')}/10")
+                        if validated_data.get('Validation_Notes'):
+                            print(f"   📝 Notes: {validated_data['Validation_Notes']}")
+                    
+                        # Log success
+                        logger.info(f"SUCCESS: {row['Company Name']} - Quality: {validated_data.get('Data_Quality', 'Unknown')}")
+                    else:
+                        print(f"❌ FINAL RESULT: No valid data found for {row['Company Name']}")
+                        logger.warning(f"NO VALID DATA: {row['Company Name']} - All sources failed validation")
+                else:
+                    print(f"❌ FINAL RESULT: All search methods failed for {row['Company Name']}")
+                    logger.error(f"COMPLETE FAILURE: {row['Company Name']} - All sources and validation failed")
+            
+                print("=" * 80)
+        
+            # Continue with regular scraping if website is available
+            if row['Website'] and not is_missing(row['Website']) and row['Website'].strip() != '':
+                url = row["Website"].strip()
+                if not url.startswith("http://") and not url.startswith("https://"):
+                    url = "https://" + url
+            
+                # Reuse an earlier check of this URL: skip dead sites and go straight to the final URL
+                verdict = lookup_url_check(url)
+                if verdict is not None and not verdict["ok"]:
+                    print(f"⚠️  Skipping website crawl for {row['Company Name']}: {url} was unreachable (status {verdict['status']})")
+                    return updates
+                if verdict is not None:
+                    url = verdict["final_url"]
+            
+                site = get_site_crawler().crawl(url)
+                homepage = site["pages"][0]
+                # The homepage fetch doubles as a URL check for this URL
+                store_url_check(url, homepage["error"] is None, homepage["status"], homepage["final_url"])
+            
+                # Report every page that could not be fetched instead of dropping it
+                for page in site["pages"]:
+                    if page["error"]:
+                        logger.warning(f"Crawl failed for {row['Company Name']}: {page['url']} - {page['error']}")
+                fetched_ok = sum(1 for page in site["pages"] if page["error"] is None)
+                print(f"  🕸️ Crawled {fetched_ok}/{len(site['pages'])} pages for {row['Company Name']}")
+                if homepage["error"]:
+                    print(f"⚠️  Homepage fetch failed for {row['Company Name']}: {homepage['error']}")
+                    return updates
+            
+                # Social links from homepage
+                updates["Facebook"] = site["socials"]["Facebook"]
+                updates["Instagram"] = site["socials"]["Instagram"]
+                updates["LinkedIn"] = site["socials"]["LinkedIn"]
+                # Contacts were extracted per page by the crawler (and reused for unchanged pages)
+                contacts = site["contacts"]
+                cleaned_emails, cleaned_phones = clean_contacts(contacts["emails"], contacts["phones"])
+                updates["Email"] = ", ".join(cleaned_emails)
+                updates["Phone"] = ", ".join(cleaned_phones)
+        except Exception as e:
+            metrics.increment("firm_errors_total", kind=type(e).__name__)
+            print(f"Failed to process {row.get('Company Name', 'Unknown')}: {e}")
+        return updates
+
+    def enrich_dataframe(self, df, journal=None, completed=None):
+        """
+        Enrich every firm in the DataFrame using a pool of worker threads.
+        Firms finish in any order, but updates are written back by row index
+        once all workers are done, so the output is the same as a serial run.
+        Firms found in `completed` (loaded from a journal) are not re-enriched;
+        their journaled updates are applied instead.
+        With deduplication on, duplicate firms are enriched once and the
+        result is copied to every matching row.
+        """
+        entities = self.entities
+        completed = completed or {}
+        results = {}
+        pending_rows = []
+        for index, row in df.iterrows():
+            key = firm_key(row)
+            if key in completed:
+                results[index] = completed[key]
+            else:
+                pending_rows.append((index, row))
+    
+        if completed:
+            print(f"⏭️  Resuming: {len(results)} firms already in journal, {len(pending_rows)} remaining")
+    
+        # Group duplicates: one firm per entity is enriched, preferring one with a website
+        if entities is not None and entities.trim():
+            logger.info(f"Dedup: index emptied after {entities.max_entities} entities to bound memory")
+        groups = {}
+        for position, (index, row) in enumerate(pending_rows):
+            entity_id = entities.match(row) if entities is not None else position
+            groups.setdefault(entity_id, []).append((index, row))
+    
+        def record(index, row, updates):
+            results[index] = updates
+            if journal:
+                journal.record(row, updates)
+        
+        def record_group(members, source_index, source_row, updates):
+            # Each row gets the entity's updates with its own stale fields and provenance
+            for index, row in members:
+                if index != source_index:
+                    updates_for_row = fan_out_updates(source_row, row, updates)
+                else:
+                    updates_for_row = updates
+                record(index, row, self.stamp(row, updates_for_row, source_row))
+    
+        to_enrich = []
+        for entity_id, members in groups.items():
+            # In refresh mode, fetch whatever is stale for any row of the entity
+            stale = self.refresh_fields(row for _, row in members)
+            known = entities.result(entity_id) if entities is not None else None
+            if known is not None and (known[2] is None or stale <= known[2]):
+                # Enriched earlier (e.g. in a previous chunk) for at least these fields
+                source_row, updates, _ = known
+                record_group(members, None, source_row, updates)
+                continue
+            source = next((member for member in members if firm_domain(member[1])), members[0])
+            to_enrich.append((entity_id, source, members, stale))
+    
+        duplicates = len(pending_rows) - len(to_enrich)
+        if duplicates:
+            print(f"🧬 Dedup: {len(pending_rows)} firms -> {len(to_enrich)} to enrich ({duplicates} duplicates reuse another row's result)")
+            logger.info(f"Dedup: {len(pending_rows)} firms, {len(to_enrich)} enriched, {duplicates} duplicates")
+    
+        executor = ThreadPoolExecutor(max_workers=max(1, self.max_workers))
+        try:
+            futures = {
+                executor.submit(self.fetch_firm, source[1], stale): (entity_id, source, members, stale)
+                for entity_id, source, members, stale in to_enrich
+            }
+            for future in tqdm(as_completed(futures), total=len(futures)):
+                entity_id, (source_index, source_row), members, stale = futures[future]
+                updates = future.result()
+                if entities is not None:
+                    entities.store(entity_id, source_row, updates, stale)
+                record_group(members, source_index, source_row, updates)
+        except KeyboardInterrupt:
+            # Drop queued firms; everything finished so far is already journaled
+            executor.shutdown(wait=False, cancel_futures=True)
+            print("⚠️  Interrupted. Rerun with --resume to continue from the journal.")
+            raise
+        executor.shutdown()
+    
+        # Write results back in the original row order
+        for index in df.index:
+            for column, value in results.get(index, {}).items():
+                df.at[index, column] = value
+        return df
+
+    def enrich_stream(self, input_path, output_path, chunk_size=None, journal=None, completed=None):
+        """
+        Read the input in chunks (default: STREAM_CHUNK_SIZE rows), enrich each
+        chunk and append it to the output sink. Only one chunk is held in
+        memory at a time, whatever the size of the input.
+        """
+        chunk_size = chunk_size if chunk_size is not None else config.STREAM_CHUNK_SIZE
+        sink = ResultSink(output_path)
+        try:
+            for chunk_number, chunk in enumerate(read_csv_chunks(input_path, chunk_size), 1):
+                first_row = sink.rows_written + 1
+                print(f"📦 Chunk {chunk_number}: rows {first_row}-{first_row + len(chunk) - 1}")
+                chunk = self.enrich_dataframe(prepare_firms(chunk), journal=journal, completed=completed)
+                sink.write(chunk)
+        finally:
+            sink.close()
+        print(f"✅ Scraping complete. {sink.rows_written} rows streamed to '{output_path}'")
+    
+    def enrich_queue(self, queue, worker, wait=False):
+        """
+        Work through a shared WorkQueue: lease firms, enrich them on
+        max_workers threads and write the updates back. Leases are renewed
+        while firms are in flight. Returns once the queue has no pending or
+        leased jobs left (with `wait`, keeps polling for new jobs instead).
+        """
+        executor = ThreadPoolExecutor(max_workers=max(1, self.max_workers))
+        in_flight = {}
+        enriched = 0
+        last_renewal = time.monotonic()
+        try:
+            while True:
+                free = self.max_workers - len(in_flight)
+                if free > 0:
+                    for job_id, row in queue.lease(worker, free):
+                        in_flight[executor.submit(self.enrich_firm, row)] = job_id
+                
+                if not in_flight:
+                    counts = queue.counts()
+                    if not wait and counts["pending"] == 0 and counts["leased"] == 0:
+                        break
+                    # Firms leased by other workers come back here if their leases expire
+                    time.sleep(config.QUEUE_POLL_SECONDS)
+                    continue
+                
+                done, _ = wait_futures(in_flight, timeout=config.QUEUE_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_id = in_flight.pop(future)
+                    try:
+                        updates = future.result()
+                    except Exception as e:
+                        queue.fail(job_id, worker, e)
+                        logger.error(f"Queue job {job_id} failed on {worker}: {e}")
+                        continue
+                    if queue.complete(job_id, worker, updates):
+                        enriched += 1
+                    else:
+                        logger.warning(f"Queue job {job_id}: lease lost before it finished, result discarded")
+                
+                if time.monotonic() - last_renewal > queue.lease_seconds / 3:
+                    queue.renew(worker, list(in_flight.values()))
+                    last_renewal = time.monotonic()
+        except KeyboardInterrupt:
+            # Hand unfinished firms straight back instead of waiting for their leases to expire
+            queue.release(worker, list(in_flight.values()))
+            executor.shutdown(wait=False, cancel_futures=True)
+            print(f"⚠️  Interrupted. {len(in_flight)} firms returned to the queue.")
+            raise
+        executor.shutdown()
+        print(f"✅ Worker {worker} finished: {enriched} firms enriched")
+        return enriched
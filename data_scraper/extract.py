@@ -0,0 +1,349 @@
+"""
+Page parsing and contact extraction
+"""
+import json
+import re
+from urllib.parse import parse_qsl, unquote, urlencode, urljoin, urlparse
+
+import lxml.html
+from lxml import etree
+
+from . import config
+from .validation import NON_DIGIT_PATTERN
+
+# Tags whose content is never visible text
+SKIPPED_TEXT_TAGS = {"script", "style", "noscript", "template"}
+
+def parse_page(html, base_url):
+    """
+    Parse a page with lxml in a single traversal, collecting anchor hrefs,
+    social links, visible text (skipping script/style/noscript/template
+    content), JSON-LD
+    blocks and schema.org microdata contact properties.
+    Returns {"text": ..., "links": [...], "socials": {...}, "structured": {...}}
+    """
+    page = {"text": "", "links": [], "socials": {"Facebook": "", "Instagram": "", "LinkedIn": ""}}
+    if isinstance(html, str):
+        html = html.encode("utf-8")
+        parser = lxml.html.HTMLParser(encoding="utf-8")
+    else:
+        parser = lxml.html.HTMLParser()
+    try:
+        root = lxml.html.fromstring(html, base_url=base_url, parser=parser)
+    except (etree.ParserError, ValueError):
+        page["structured"] = extract_structured_contacts([], [], [])
+        return page
+    
+    parts = []
+    json_ld = []
+    microdata = []
+    # Number of SKIPPED_TEXT_TAGS we are inside: lxml parses the children of
+    # <noscript> and <template> as real elements, so their text must be skipped too
+    skip_depth = 0
+    for event, element in etree.iterwalk(root, events=("start", "end", "comment", "pi")):
+        tag = element.tag
+        if event == "start":
+            if tag == "script" and (element.get("type") or "").lower() == "application/ld+json" and element.text:
+                json_ld.append(element.text)
+            itemprop = element.get("itemprop")
+            if itemprop and itemprop.lower() in MICRODATA_PROPERTIES:
+                value = element.get("content") or element.get("href") or element.text_content()
+                microdata.append((itemprop.lower(), value))
+            if tag in SKIPPED_TEXT_TAGS:
+                skip_depth += 1
+                continue
+            if tag == "a":
+                href = element.get("href")
+                if href:
+                    page["links"].append(href)
+            if element.text and not skip_depth:
+                parts.append(element.text)
+            continue
+        if event == "end" and tag in SKIPPED_TEXT_TAGS:
+            skip_depth -= 1
+        # Text after an element, comment or processing instruction
+        if element.tail and not skip_depth:
+            parts.append(element.tail)
+    
+    page["text"] = " ".join(parts)
+    page["socials"] = extract_social_links(page["links"])
+    page["structured"] = extract_structured_contacts(page["links"], json_ld, microdata)
+    return page
+
+# schema.org microdata properties read by parse_page
+MICRODATA_PROPERTIES = {"email", "telephone", "sameas"}
+# JSON-LD types whose contact details describe the firm itself (subtypes such as
+# ProfessionalService or HomeAndConstructionBusiness end in these words too)
+STRUCTURED_TYPE_SUFFIXES = ("organization", "business", "service", "contactpoint", "store", "corporation")
+
+def link_value(href, scheme):
+    """
+    The address in a mailto: or tel: link, without the scheme and any ?query
+    """
+    value = unquote(href.strip()[len(scheme):]).split("?")[0]
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+def without_scheme(value, scheme):
+    """
+    A structured-data email or telephone value without a leading mailto: or tel:
+    """
+    return value[len(scheme):].strip() if value.lower().startswith(scheme) else value
+
+def json_ld_entities(data):
+    """
+    Yield every object in a JSON-LD document, including @graph members and
+    nested values such as contactPoint
+    """
+    if isinstance(data, list):
+        for item in data:
+            yield from json_ld_entities(item)
+    elif isinstance(data, dict):
+        yield data
+        for value in data.values():
+            if isinstance(value, (dict, list)):
+                yield from json_ld_entities(value)
+
+def extract_structured_contacts(links, json_ld, microdata):
+    """
+    High-precision contacts published on purpose: mailto:/tel: links,
+    schema.org Organization/LocalBusiness JSON-LD and microdata.
+    Returns {"emails": [...], "phones": [...], "socials": [...]}, deduplicated,
+    links first, then JSON-LD, then microdata.
+    """
+    emails, phones, socials = {}, {}, {}
+    for href in links:
+        lowered = href.strip().lower()
+        if lowered.startswith("mailto:"):
+            emails.update(dict.fromkeys(link_value(href, "mailto:")))
+        elif lowered.startswith("tel:"):
+            phones.update(dict.fromkeys(link_value(href, "tel:")))
+    
+    for block in json_ld:
+        try:
+            data = json.loads(block)
+        except ValueError:
+            continue
+        for entity in json_ld_entities(data):
+            # Any JSON value can turn up here: a list, a string, a number, null or an object
+            types = entity.get("@type")
+            types = types if isinstance(types, list) else [types]
+            if not any(isinstance(name, str) and name.lower().endswith(STRUCTURED_TYPE_SUFFIXES) for name in types):
+                continue
+            for key, scheme, found in (("email", "mailto:", emails), ("telephone", "tel:", phones), ("sameAs", "", socials)):
+                values = entity.get(key)
+                for value in values if isinstance(values, list) else [values]:
+                    # "telephone": 9876543210 is common; objects and nulls carry no usable value
+                    if value is None or isinstance(value, (dict, list, bool)):
+                        continue
+                    value = str(value).strip()
+                    if scheme:
+                        value = without_scheme(value, scheme)
+                    if value:
+                        found[value] = None
+    
+    for prop, value in microdata:
+        value = (value or "").strip()
+        if not value:
+            continue
+        if prop == "email":
+            emails[without_scheme(value, "mailto:")] = None
+        elif prop == "telephone":
+            phones[without_scheme(value, "tel:")] = None
+        else:
+            socials[value] = None
+    
+    return {"emails": list(emails), "phones": list(phones), "socials": list(socials)}
+
+def clean_page_text(text):
+    """
+    Normalize page text for contact scanning: no-break and zero-width
+    spaces become spaces and runs of whitespace are collapsed
+    """
+    text = text.replace('\xa0', ' ').replace('\u200b', ' ')
+    return ' '.join(text.split())
+
+# Second-level labels under which a domain is registered, e.g. example.co.in
+SECOND_LEVEL_DOMAINS = {"co", "com", "net", "org", "gov", "ac", "edu", "nic", "res", "gen", "firm", "ind"}
+# Site-builder and hosting suffixes under which each subdomain is a separate site (firm-a.wixsite.com)
+HOSTED_SITE_SUFFIXES = {
+    "wixsite.com", "blogspot.com", "blogspot.in", "github.io", "business.site", "wordpress.com", "weebly.com",
+    "godaddysites.com", "webflow.io", "netlify.app", "vercel.app", "pages.dev", "web.app", "firebaseapp.com",
+    "herokuapp.com", "square.site", "mystrikingly.com", "carrd.co"
+}
+# Query parameters that only track where a click came from
+TRACKING_PARAM_PREFIXES = ("utm_", "fbclid", "gclid", "msclkid", "mc_", "ref", "source")
+# Links to files rather than pages
+SKIPPED_LINK_EXTENSIONS = (".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".zip", ".doc", ".docx", ".xls", ".xlsx", ".mp4")
+
+def registrable_domain(host):
+    """
+    Approximate registrable domain of a host (www.shop.example.co.in -> example.co.in)
+    without a public suffix list; on a hosting suffix the firm's own subdomain
+    is kept (www.firm.wixsite.com -> firm.wixsite.com). IP addresses are returned unchanged.
+    """
+    host = host.lower().split(":")[0].rstrip(".")
+    labels = host.split(".")
+    if host.replace(".", "").isdigit() or len(labels) <= 2:
+        return host
+    for suffix in HOSTED_SITE_SUFFIXES:
+        if host.endswith("." + suffix):
+            return ".".join(labels[-(suffix.count(".") + 2):])
+    if len(labels[-1]) == 2 and labels[-2] in SECOND_LEVEL_DOMAINS:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+def normalize_url(href, base_url):
+    """
+    Resolve a link against the page URL and normalize it so variants of the
+    same page compare equal: lowercase scheme and host, no default port,
+    fragment, tracking parameters or trailing slash, sorted query parameters.
+    Returns None for anything that is not an http(s) page (mailto:, tel:,
+    javascript:, files).
+    """
+    url = urljoin(base_url, href.strip())
+    parts = urlparse(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return None
+    path = parts.path or "/"
+    if path.lower().endswith(SKIPPED_LINK_EXTENSIONS):
+        return None
+    if len(path) > 1:
+        path = path.rstrip("/")
+    netloc = parts.hostname
+    if parts.port and parts.port != {"http": 80, "https": 443}[parts.scheme]:
+        netloc = f"{netloc}:{parts.port}"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    ))
+    return f"{parts.scheme}://{netloc}{path}" + (f"?{query}" if query else "")
+
+def link_score(url):
+    """
+    Priority of a link from CRAWL_LINK_SCORES by its path and query, e.g.
+    /contact-us or index.php?page=contact (0 = not worth fetching)
+    """
+    parts = urlparse(url)
+    target = f"{parts.path}?{parts.query}".lower()
+    return max((score for word, score in config.CRAWL_LINK_SCORES.items() if word in target), default=0)
+
+def get_internal_links(links, base_url):
+    """
+    Contact/about/team pages on the same registrable domain as base_url,
+    normalized and deduplicated, as (score, url) pairs best first
+    """
+    domain = registrable_domain(urlparse(base_url).netloc)
+    candidates = {}
+    for href in links:
+        url = normalize_url(href, base_url)
+        if url is None or url in candidates or registrable_domain(urlparse(url).netloc) != domain:
+            continue
+        score = link_score(url)
+        if score > 0:
+            candidates[url] = score
+    # Stable sort keeps page order among links with the same score
+    return sorted(((score, url) for url, score in candidates.items()), key=lambda item: -item[0])
+
+def extract_social_links(links):
+    social_links = {"Facebook": "", "Instagram": "", "LinkedIn": ""}
+    for href in links:
+        if "facebook.com" in href:
+            social_links["Facebook"] = href
+        elif "instagram.com" in href:
+            social_links["Instagram"] = href
+        elif "linkedin.com" in href:
+            social_links["LinkedIn"] = href
+    return social_links
+
+def clean_contacts(emails, phones):
+    unique_emails = list(set([e.lower() for e in emails if '@' in e and '.' in e]))
+    
+    # Improved phone cleaning
+    cleaned_phones = []
+    for phone in phones:
+        # Remove all non-digit characters
+        digits = NON_DIGIT_PATTERN.sub('', phone)
+        
+        # If number has country code, remove it (assuming +91 or similar)
+        if len(digits) > 10:
+            digits = digits[-10:]
+            
+        # Only keep valid 10-digit numbers
+        if len(digits) == 10:
+            # Format as XXXXX XXXXX
+            formatted = f"{digits[:5]} {digits[5:]}"
+            cleaned_phones.append(formatted)
+    
+    # Remove duplicates while preserving order
+    seen = set()
+    unique_phones = []
+    for phone in cleaned_phones:
+        if phone not in seen:
+            seen.add(phone)
+            unique_phones.append(phone)
+            
+    return unique_emails, unique_phones
+
+class ContactExtractor:
+    """
+    Single-pass contact extractor with precompiled patterns.
+    scan() walks a text buffer once and returns emails, Indian phone
+    numbers, labelled addresses and social profile URLs together.
+    """
+    
+    # Each branch starts with a cheap one-character check so ordinary text
+    # is skipped quickly; case-insensitivity is scoped to the words that need it
+    PATTERN = re.compile(
+        # Social profile URLs (checked first so their paths are not re-read as phones)
+        r'(?P<social>https?://(?i:(?:[a-z0-9-]+\.)?(?P<network>facebook|instagram|linkedin)\.com/)[^\s"\'<>]*)'
+        # Emails, starting at a token boundary
+        r'|(?=[a-zA-Z0-9_.+-])(?<![a-zA-Z0-9_.+-])(?P<email>[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+(?:\.[a-zA-Z0-9-]+)+)'
+        # Indian phone numbers with optional +91/0091/91 prefix, not part of a longer number
+        r'|(?=[+(\d])(?<![\d+])(?P<phone>(?:(?:\+|00)?91[-.\s]?)?(?:'
+        # Mobile numbers start with 6-9, so a year next to a PIN code is not one
+        r'[6-9]\d{4}[-.\s]?\d{5}'                      # 98765 43210 / 9876543210
+        r'|[6-9]\d{3}[-.\s]?\d{3}[-.\s]?\d{3}'         # 9876 543 210
+        r'|\(\d{2,4}\)[-.\s]?\d{3,4}[-.\s]?\d{3,4}'   # (022) 2345 6789
+        r'|0\d{2,4}[-.\s]\d{3,4}[-.\s]?\d{4}'          # 022-23456789 / 022 2345 6789
+        r')(?!\d))'
+        # Labelled addresses - zero-width so contacts inside the address are still found
+        r'|(?=[AaLlOo])(?<!\w)(?=(?i:address|location|office)[:\s]+(?P<address>[^,\n]{1,120}(?:,[^,\n]{1,120}){0,8}))'
+    )
+    
+    def scan(self, text):
+        """
+        Scan text once and return unique matches in order of appearance:
+        {"emails": [...], "phones": [...], "addresses": [...],
+         "socials": {"facebook": [...], "instagram": [...], "linkedin": [...]}}
+        """
+        found = {
+            "emails": {},
+            "phones": {},
+            "addresses": {},
+            "socials": {"facebook": {}, "instagram": {}, "linkedin": {}}
+        }
+        if not text:
+            return self.as_lists(found)
+        
+        # Dicts keep first-seen order while dropping duplicates
+        for match in self.PATTERN.finditer(text):
+            if match.group("social"):
+                found["socials"][match.group("network").lower()][match.group("social")] = None
+            elif match.group("email"):
+                found["emails"][match.group("email")] = None
+            elif match.group("phone"):
+                found["phones"][match.group("phone").strip()] = None
+            elif match.group("address"):
+                found["addresses"][match.group("address").strip()] = None
+        return self.as_lists(found)
+    
+    @staticmethod
+    def as_lists(found):
+        return {
+            "emails": list(found["emails"]),
+            "phones": list(found["phones"]),
+            "addresses": list(found["addresses"]),
+            "socials": {network: list(urls) for network, urls in found["socials"].items()}
+        }
+
+contact_extractor = ContactExtractor()
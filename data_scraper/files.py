@@ -0,0 +1,125 @@
+"""
+Reading the firm list and writing results (pandas is imported on first use)
+"""
+import datetime
+import json
+import os
+
+from . import config
+
+# Define all expected columns
+expected_columns = [
+    "No.", 
+    "Business Type", 
+    "Company Name", 
+    "Location", 
+    "Website",
+    "Founder(s)/Owner(s)/Director(s)",
+    "Email",
+    "Phone",
+    "Facebook",
+    "Instagram",
+    "LinkedIn",
+    config.PROVENANCE_COLUMN
+]
+
+def prepare_firms(df):
+    """
+    Add any missing output columns
+    """
+    for col in expected_columns:
+        if col not in df.columns:
+            df[col] = ""
+        elif df[col].dtype != object:
+            # An all-blank column is read as float64, which can't hold the text we write back
+            df[col] = df[col].astype(object)
+    return df
+
+def load_firms(path):
+    """
+    Load the list of firms and add any missing output columns.
+    An Excel file (e.g. a previous run's output, for --refresh) is read too.
+    """
+    import pandas as pd
+    if os.path.splitext(path)[1].lower() in (".xlsx", ".xls"):
+        return prepare_firms(pd.read_excel(path))
+    return prepare_firms(pd.read_csv(path))
+
+def read_csv_chunks(path, chunk_size):
+    """
+    Iterate over the firms in a CSV file in DataFrames of chunk_size rows
+    """
+    import pandas as pd
+    return pd.read_csv(path, chunksize=chunk_size)
+
+def save_results(df, path=None):
+    """
+    Save to Excel (default: config.OUTPUT_PATH) with error handling
+    """
+    path = path if path is not None else config.OUTPUT_PATH
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    stem = os.path.splitext(path)[0]
+    
+    try:
+        df.to_excel(path, index=False)
+        print(f"✅ Scraping complete. Data saved to '{path}'")
+    except PermissionError:
+        # If the file is open, save with timestamp
+        backup_filename = f"{stem}_{timestamp}.xlsx"
+        df.to_excel(backup_filename, index=False)
+        print(f"⚠️  Original file was locked. Data saved to '{backup_filename}'")
+    except Exception as e:
+        # If Excel fails, save as CSV as backup
+        csv_filename = f"{stem}_{timestamp}.csv"
+        df.to_csv(csv_filename, index=False)
+        print(f"⚠️  Excel save failed. Data saved as CSV: '{csv_filename}'")
+        print(f"Error: {e}")
+
+class ResultSink:
+    """
+    Append-only output file for streaming mode.
+    The format is picked from the extension: .csv, .jsonl or .parquet.
+    Parquet needs pyarrow, which is only imported when used.
+    """
+    
+    FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".parquet": "parquet"}
+    
+    def __init__(self, path):
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in self.FORMATS:
+            raise ValueError(f"Unsupported stream output '{path}' (use .csv, .jsonl or .parquet)")
+        self.path = path
+        self.format = self.FORMATS[extension]
+        self.rows_written = 0
+        self.parquet_writer = None
+        # Each run rewrites the sink from the start of the input
+        if os.path.exists(path):
+            os.remove(path)
+    
+    def write(self, df):
+        """
+        Append one enriched chunk
+        """
+        if self.format == "csv":
+            df.to_csv(self.path, mode="a", header=self.rows_written == 0, index=False)
+        elif self.format == "jsonl":
+            records = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+            with open(self.path, "a", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        else:
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise RuntimeError("Parquet output needs pyarrow: pip install pyarrow")
+            # Store every column as string so chunks always share one schema
+            table = pa.Table.from_pandas(df.astype("string"), preserve_index=False)
+            if self.parquet_writer is None:
+                self.parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self.parquet_writer.write_table(table)
+        self.rows_written += len(df)
+    
+    def close(self):
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
@@ -0,0 +1,89 @@
+"""
+Pooled HTTP sessions: a shared one for URL checks and website crawling, and
+one for paid provider APIs (SERP API, Tavily)
+"""
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import config
+from .metrics import metrics
+
+class CountingRetry(Retry):
+    """
+    urllib3 Retry that counts each retry in the run metrics
+    """
+    def increment(self, method=None, url=None, *args, **kwargs):
+        metrics.increment("http_retries_total", method=method or "")
+        return super().increment(method, url, *args, **kwargs)
+
+def create_http_session(retry_methods=("GET", "HEAD"), retry_statuses=(429, 500, 502, 503, 504)):
+    """
+    Create a requests session with per-host connection pooling and
+    bounded retries with exponential backoff and jitter
+    """
+    retry = CountingRetry(
+        total=config.HTTP_RETRIES,
+        backoff_factor=config.HTTP_BACKOFF_FACTOR,
+        backoff_jitter=config.HTTP_BACKOFF_JITTER,
+        status_forcelist=retry_statuses,
+        allowed_methods=frozenset(retry_methods),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=config.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=config.HTTP_POOL_MAXSIZE,
+        max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(config.HTTP_HEADERS)
+    return session
+
+# Created on first use, so HTTP settings changed in config after import still apply
+http_session = None
+http_session_lock = threading.Lock()
+
+def get_http_session():
+    """
+    Return the shared pooled session for URL checks and website crawling
+    """
+    global http_session
+    with http_session_lock:
+        if http_session is None:
+            http_session = create_http_session()
+    return http_session
+
+def http_get(url, **kwargs):
+    """
+    GET through the shared pooled session with the default timeout
+    """
+    kwargs.setdefault("timeout", config.HTTP_TIMEOUT)
+    return get_http_session().get(url, **kwargs)
+
+def create_provider_session():
+    """
+    Session for paid provider APIs. 429s are left to the provider's rate
+    limiter (limits.call_provider), which backs off and counts them against
+    the budget, and POSTs are never retried, so a request is not paid for twice.
+    """
+    return create_http_session(retry_methods=("GET",), retry_statuses=(500, 502, 503, 504))
+
+# Created on first use, like http_session
+provider_session = None
+provider_session_lock = threading.Lock()
+
+def provider_get(url, **kwargs):
+    """
+    GET a paid provider API through the provider session with the default timeout
+    """
+    global provider_session
+    with provider_session_lock:
+        if provider_session is None:
+            provider_session = create_provider_session()
+    kwargs.setdefault("timeout", config.HTTP_TIMEOUT)
+    return provider_session.get(url, **kwargs)
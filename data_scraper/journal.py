@@ -0,0 +1,105 @@
+"""
+Journal of completed firms, used to resume an interrupted run
+"""
+import datetime
+import json
+import logging
+import os
+
+from .validation import is_missing, normalize_domain
+
+logger = logging.getLogger(__name__)
+
+def firm_key(row):
+    """
+    Journal key for a firm row: its position in the input file (the row
+    index), then normalized company name, location, business type and
+    website, so same-named rows and branches each keep their own entry
+    """
+    position = getattr(row, "name", None)
+    parts = ["" if position is None else str(position)]
+    for column in ["Company Name", "Location", "Business Type"]:
+        value = row.get(column, "")
+        parts.append("" if is_missing(value) else str(value).strip().lower())
+    website = row.get("Website", "")
+    parts.append("" if is_missing(website) or not str(website).strip() else normalize_domain(str(website).strip()))
+    return "|".join(parts)
+
+class FirmJournal:
+    """
+    Append-only JSONL journal of completed firms.
+    Each line is flushed to disk as soon as the firm finishes, so a crash
+    or Ctrl-C loses at most the firms that were still in flight.
+    A fresh journal never overwrites an earlier one: the old file is renamed
+    with a timestamp and kept in rotated_path.
+    """
+    
+    def __init__(self, path, fresh=False):
+        self.path = path
+        self.rotated_path = self.rotate(path) if fresh else None
+        needs_newline = False
+        if not fresh and os.path.exists(path) and os.path.getsize(path) > 0:
+            # Start on a fresh line if the last write was cut off
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        self.file = open(path, "a", encoding="utf-8")
+        if needs_newline:
+            self.file.write("\n")
+    
+    @staticmethod
+    def rotate(path):
+        """
+        Rename a non-empty journal to PATH-STEM.YYYYmmdd-HHMMSS.EXT so a new run
+        can start without losing it. Returns the new path, or None.
+        """
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return None
+        stem, ext = os.path.splitext(path)
+        stamp = datetime.datetime.fromtimestamp(os.path.getmtime(path)).strftime("%Y%m%d-%H%M%S")
+        rotated = f"{stem}.{stamp}{ext}"
+        suffix = 1
+        while os.path.exists(rotated):
+            suffix += 1
+            rotated = f"{stem}.{stamp}-{suffix}{ext}"
+        os.replace(path, rotated)
+        return rotated
+    
+    @staticmethod
+    def load(path):
+        """
+        Read a journal and return {firm key: column updates}; later entries win
+        """
+        completed = {}
+        if not os.path.exists(path):
+            return completed
+        with open(path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write can leave a truncated last line
+                    logger.warning(f"Skipping unreadable journal line {line_number} in {path}")
+                    continue
+                completed[entry["key"]] = entry["updates"]
+        return completed
+    
+    def record(self, row, updates):
+        """
+        Append one completed firm and flush it to disk
+        """
+        entry = {
+            "key": firm_key(row),
+            "company": row.get("Company Name", ""),
+            "completed_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "updates": updates
+        }
+        self.file.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+    
+    def close(self):
+        self.file.close()
@@ -0,0 +1,205 @@
+"""
+Per-provider rate limits, call budgets and 429 handling
+"""
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from . import config
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class RateLimitedError(Exception):
+    """
+    Raised when a provider answers HTTP 429
+    """
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def is_rate_limit_error(error):
+    """
+    Recognize 429s from our own calls, the Gemini SDK (ResourceExhausted) and the Tavily SDK
+    """
+    if isinstance(error, RateLimitedError) or getattr(error, "code", None) == 429:
+        return True
+    return type(error).__name__ in ("ResourceExhausted", "UsageLimitExceededError")
+
+class ProviderLimiter:
+    """
+    Token-bucket rate limiter and quota governor for one paid provider.
+    Keeps one bucket per configured window (second, minute, day) and a
+    per-run call budget. A 429 halves the refill rate and pauses calls for
+    a cool-down; successful calls let the rate recover gradually.
+    """
+    
+    WINDOWS = {"per_second": 1, "per_minute": 60, "per_day": 86400}
+    
+    def __init__(self, name, per_second=None, per_minute=None, per_day=None, budget=None):
+        self.name = name
+        self.budget = budget
+        limits = {"per_second": per_second, "per_minute": per_minute, "per_day": per_day}
+        self.buckets = [
+            {"limit": limits[key], "window": window, "tokens": float(limits[key])}
+            for key, window in self.WINDOWS.items() if limits[key]
+        ]
+        self.lock = threading.Lock()
+        self.last_refill = time.monotonic()
+        self.rate_factor = 1.0
+        self.blocked_until = 0.0
+        self.consecutive_429 = 0
+        self.calls = 0
+        self.skipped = 0
+    
+    def refill(self, now):
+        elapsed = now - self.last_refill
+        self.last_refill = now
+        for bucket in self.buckets:
+            rate = bucket["limit"] / bucket["window"] * self.rate_factor
+            bucket["tokens"] = min(bucket["limit"], bucket["tokens"] + elapsed * rate)
+    
+    def acquire(self):
+        """
+        Wait for a call slot. Returns False if the run budget is spent or the
+        wait would exceed RATE_LIMIT_MAX_WAIT, so the caller can degrade.
+        """
+        with self.lock:
+            if self.budget is not None and self.calls >= self.budget:
+                self.skip(f"run budget of {self.budget} calls used up")
+                return False
+            
+            now = time.monotonic()
+            self.refill(now)
+            wait = max(0.0, self.blocked_until - now)
+            for bucket in self.buckets:
+                if bucket["tokens"] < 1:
+                    rate = bucket["limit"] / bucket["window"] * self.rate_factor
+                    wait = max(wait, (1 - bucket["tokens"]) / rate)
+            if wait > config.RATE_LIMIT_MAX_WAIT:
+                self.skip(f"next slot is {wait:.0f}s away")
+                return False
+            
+            # Reserve the slot now; later callers queue behind it
+            for bucket in self.buckets:
+                bucket["tokens"] -= 1
+            self.calls += 1
+        
+        if wait > 0:
+            time.sleep(wait)
+        return True
+    
+    def skip(self, reason):
+        """
+        Record a skipped call; caller must hold the lock
+        """
+        self.skipped += 1
+        if self.skipped == 1 or self.skipped % 100 == 0:
+            print(f"    💸 {self.name} limit reached ({reason}) - skipping calls ({self.skipped} so far)")
+            logger.warning(f"Rate limit: skipping {self.name} call ({reason}), {self.skipped} skipped so far")
+    
+    def report_429(self, retry_after=None):
+        """
+        Slow down after the provider answered 429
+        """
+        with self.lock:
+            self.consecutive_429 += 1
+            self.rate_factor = max(0.1, self.rate_factor / 2)
+            cooldown = retry_after if retry_after else min(60, 2 ** self.consecutive_429)
+            self.blocked_until = max(self.blocked_until, time.monotonic() + cooldown)
+        logger.warning(f"{self.name} returned 429 - slowing to {self.rate_factor:.0%} and pausing {cooldown}s")
+    
+    def report_success(self):
+        with self.lock:
+            self.consecutive_429 = 0
+            self.rate_factor = min(1.0, self.rate_factor + 0.05)
+
+# Built from config.RATE_LIMITS on first use; assign a dict of limiters to override
+rate_limiters = None
+rate_limiters_lock = threading.Lock()
+
+def get_rate_limiter(provider):
+    """
+    Return the shared limiter for a provider, creating all limiters on first use
+    """
+    global rate_limiters
+    with rate_limiters_lock:
+        if rate_limiters is None:
+            rate_limiters = {name: ProviderLimiter(name, **limits) for name, limits in config.RATE_LIMITS.items()}
+    return rate_limiters[provider]
+
+# Limits shared with other worker processes (a WorkQueue), set by queue workers
+shared_quota = None
+
+def acquire_shared(provider, limiter):
+    """
+    Take a call slot from the limits shared by all queue workers, waiting for
+    a window to free up. Returns False when the shared budget is spent or the
+    wait would exceed RATE_LIMIT_MAX_WAIT.
+    """
+    waited = 0.0
+    while True:
+        wait = shared_quota.reserve_call(provider, config.RATE_LIMITS.get(provider, {}))
+        if wait == 0:
+            return True
+        if wait is None or waited + wait > config.RATE_LIMIT_MAX_WAIT:
+            with limiter.lock:
+                limiter.skip("shared run budget used up" if wait is None else f"shared limit, next slot is {wait:.0f}s away")
+            return False
+        time.sleep(wait)
+        waited += wait
+
+# Providers actually called (not answered from the cache or skipped by a
+# limiter) in the current count_provider_calls() block, for cost reports
+provider_calls = contextvars.ContextVar("provider_calls", default=None)
+
+@contextmanager
+def count_provider_calls():
+    """
+    Collect the providers called inside the block into the yielded list.
+    Work handed to other threads is counted when it runs under
+    contextvars.copy_context(), or passed back with note_provider_calls().
+    """
+    calls = []
+    token = provider_calls.set(calls)
+    try:
+        yield calls
+    finally:
+        provider_calls.reset(token)
+
+def note_provider_calls(calls):
+    """
+    Add calls made on another thread to the current count_provider_calls() block
+    """
+    current = provider_calls.get()
+    if current is not None:
+        current.extend(calls)
+
+def call_provider(provider, fetch):
+    """
+    Call a paid provider through its rate limiter, retrying 429s after backing off.
+    Returns None when the provider is over budget or quota, so the firm is
+    still processed with the other sources instead of failing.
+    """
+    limiter = get_rate_limiter(provider)
+    for attempt in range(config.RATE_LIMIT_429_RETRIES + 1):
+        if not limiter.acquire() or (shared_quota is not None and not acquire_shared(provider, limiter)):
+            metrics.increment("api_skipped_total", provider=provider)
+            return None
+        metrics.increment("api_calls_total", provider=provider)
+        calls = provider_calls.get()
+        if calls is not None:
+            calls.append(provider)
+        try:
+            result = fetch()
+        except Exception as e:
+            if is_rate_limit_error(e) and attempt < config.RATE_LIMIT_429_RETRIES:
+                metrics.increment("api_retries_total", provider=provider)
+                limiter.report_429(getattr(e, "retry_after", None))
+                continue
+            metrics.increment("api_errors_total", provider=provider)
+            raise
+        limiter.report_success()
+        return result
@@ -0,0 +1,188 @@
+"""
+Run metrics: per-stage latency histograms, counters and their export
+"""
+import functools
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+class Metrics:
+    """
+    Thread-safe run metrics: per-stage latency histograms and labelled
+    counters (API calls, retries, errors, cache lookups, bytes downloaded).
+    Printed as a summary at the end of a run and exported as JSON or
+    Prometheus text format with --metrics.
+    Bucket bounds and the sample limit not given here are read from config
+    when a stage's histogram is created.
+    """
+    
+    def __init__(self, buckets=None, max_samples=None):
+        self.buckets = buckets
+        self.max_samples = max_samples
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.counters = {}
+    
+    def observe(self, stage, seconds):
+        """
+        Record one duration for a stage
+        """
+        with self.lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                buckets = self.buckets if self.buckets is not None else config.METRICS_BUCKETS
+                max_samples = self.max_samples if self.max_samples is not None else config.METRICS_MAX_SAMPLES
+                histogram = self.stages[stage] = {
+                    "bounds": tuple(buckets), "counts": [0] * len(buckets), "count": 0, "sum": 0.0,
+                    "samples": deque(maxlen=max_samples)
+                }
+            for i, bound in enumerate(histogram["bounds"]):
+                if seconds <= bound:
+                    histogram["counts"][i] += 1
+                    break
+            histogram["count"] += 1
+            histogram["sum"] += seconds
+            histogram["samples"].append(seconds)
+    
+    @contextmanager
+    def timer(self, stage):
+        """
+        Context manager timing a block into a stage histogram
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+    
+    def increment(self, name, amount=1, **labels):
+        """
+        Add to a counter, e.g. increment("api_calls_total", provider="serp")
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+    
+    def counter(self, name, **labels):
+        """
+        Sum of a counter over all label sets matching `labels`
+        """
+        with self.lock:
+            return sum(
+                value for (counter_name, counter_labels), value in self.counters.items()
+                if counter_name == name and all(dict(counter_labels).get(k) == v for k, v in labels.items())
+            )
+    
+    def snapshot(self):
+        """
+        Metrics as a JSON-serialisable dict
+        """
+        with self.lock:
+            stages = {}
+            for stage, histogram in sorted(self.stages.items()):
+                samples = sorted(histogram["samples"])
+                stages[stage] = {
+                    "count": histogram["count"],
+                    "sum_seconds": round(histogram["sum"], 3),
+                    "p50_seconds": round(samples[int(0.5 * (len(samples) - 1))], 4),
+                    "p95_seconds": round(samples[int(round(0.95 * (len(samples) - 1)))], 4),
+                    "buckets": dict(zip([str(bound) for bound in histogram["bounds"]], histogram["counts"]))
+                }
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self.counters.items())
+            ]
+        return {"stages": stages, "counters": counters}
+    
+    def prometheus(self):
+        """
+        Metrics in Prometheus text exposition format
+        """
+        def label_text(labels):
+            if not labels:
+                return ""
+            return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+        
+        lines = ["# TYPE scraper_stage_seconds histogram"]
+        with self.lock:
+            for stage, histogram in sorted(self.stages.items()):
+                cumulative = 0
+                for bound, count in zip(histogram["bounds"], histogram["counts"]):
+                    cumulative += count
+                    lines.append(f'scraper_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'scraper_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram["count"]}')
+                lines.append(f'scraper_stage_seconds_sum{{stage="{stage}"}} {histogram["sum"]:.6f}')
+                lines.append(f'scraper_stage_seconds_count{{stage="{stage}"}} {histogram["count"]}')
+            names = sorted({name for name, _ in self.counters})
+            for name in names:
+                lines.append(f"# TYPE scraper_{name} counter")
+                for (counter_name, labels), value in sorted(self.counters.items()):
+                    if counter_name == name:
+                        lines.append(f"scraper_{name}{label_text(labels)} {value}")
+        return "\n".join(lines) + "\n"
+    
+    def export(self, path):
+        """
+        Write the metrics to `path`: Prometheus text for .prom/.txt, JSON otherwise
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            if path.endswith((".prom", ".txt")):
+                f.write(self.prometheus())
+            else:
+                json.dump(self.snapshot(), f, indent=2)
+        print(f"📈 Metrics written to '{path}'")
+    
+    def summary(self):
+        """
+        Print an end-of-run summary of stage latencies, API calls, cache hit rates, bytes and errors
+        """
+        snapshot = self.snapshot()
+        if not snapshot["stages"] and not snapshot["counters"]:
+            return
+        print("\n📈 Run metrics")
+        print(f"   {'stage':<14}{'calls':>8}{'p50 ms':>10}{'p95 ms':>10}{'total s':>10}")
+        for stage, stats in snapshot["stages"].items():
+            print(f"   {stage:<14}{stats['count']:>8}{stats['p50_seconds'] * 1000:>10.0f}"
+                  f"{stats['p95_seconds'] * 1000:>10.0f}{stats['sum_seconds']:>10.1f}")
+        
+        for provider in config.RATE_LIMITS:
+            calls = self.counter("api_calls_total", provider=provider)
+            hits = self.counter("cache_lookups_total", provider=provider, result="hit")
+            lookups = self.counter("cache_lookups_total", provider=provider)
+            if calls or lookups:
+                hit_rate = f"{hits / lookups:.0%}" if lookups else "n/a"
+                print(f"   🔌 {provider}: {calls} API calls, {self.counter('api_retries_total', provider=provider)} retries, "
+                      f"{self.counter('api_errors_total', provider=provider)} errors, "
+                      f"{self.counter('api_skipped_total', provider=provider)} skipped, cache hit rate {hit_rate}")
+        
+        url_lookups = self.counter("url_check_cache_total")
+        if url_lookups:
+            print(f"   🔗 URL check cache hit rate: {self.counter('url_check_cache_total', result='hit') / url_lookups:.0%} of {url_lookups}")
+        print(f"   📥 Downloaded: {self.counter('bytes_downloaded_total') / 2**20:.1f} MB, "
+              f"HTTP retries: {self.counter('http_retries_total')}")
+        errors = ", ".join(
+            f"{counter['name'][:-len('_total')]}({', '.join(counter['labels'].values())}) x{counter['value']}"
+            for counter in snapshot["counters"] if counter["name"].endswith("errors_total")
+        )
+        print(f"   ❌ Errors: {errors or 'none'}")
+
+metrics = Metrics()
+
+def timed_stage(stage):
+    """
+    Decorator recording the duration of every call in the `stage` latency histogram
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with metrics.timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
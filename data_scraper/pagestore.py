@@ -0,0 +1,111 @@
+"""
+Compressed on-disk store of crawled pages, used for conditional requests
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+class PageStore:
+    """
+    Crawled pages keyed by URL, backed by SQLite. Each entry keeps the
+    zlib-compressed body, its ETag/Last-Modified validators, a hash of the
+    content and the parsed/extracted page, so a later run can send a
+    conditional request and skip parsing when the page has not changed.
+    Entries not fetched for max_age_seconds are dropped when the store opens.
+    """
+
+    def __init__(self, path, max_age_seconds):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    final_url TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    content_hash TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    parsed BLOB,
+                    fetched_at REAL NOT NULL
+                )
+            """)
+            self.conn.execute("DELETE FROM pages WHERE fetched_at < ?", (time.time() - max_age_seconds,))
+            self.conn.commit()
+
+    def get(self, url):
+        """
+        Return the stored page for url as a dict, or None
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT final_url, etag, last_modified, content_hash, body, parsed FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        final_url, etag, last_modified, content_hash, body, parsed = row
+        return {
+            "final_url": final_url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_hash": content_hash,
+            "body": zlib.decompress(body),
+            "parsed": json.loads(zlib.decompress(parsed)) if parsed else None
+        }
+
+    def put(self, url, final_url, etag, last_modified, content_hash, body, parsed=None):
+        """
+        Store a fetched page body (bytes) with its validators
+        """
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages (url, final_url, etag, last_modified, content_hash, body, parsed, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, final_url, etag, last_modified, content_hash, zlib.compress(body),
+                 zlib.compress(json.dumps(parsed).encode("utf-8")) if parsed is not None else None, time.time())
+            )
+            self.conn.commit()
+
+    def set_parsed(self, url, content_hash, parsed):
+        """
+        Attach the parsed page to a stored body, if the body has not changed since
+        """
+        with self.lock:
+            self.conn.execute(
+                "UPDATE pages SET parsed = ? WHERE url = ? AND content_hash = ?",
+                (zlib.compress(json.dumps(parsed).encode("utf-8")), url, content_hash)
+            )
+            self.conn.commit()
+
+    def touch(self, url):
+        """
+        Mark a stored page as freshly revalidated (after a 304)
+        """
+        with self.lock:
+            self.conn.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self.conn.commit()
+
+# Opened on first use, like the response cache
+page_store = None
+page_store_lock = threading.Lock()
+
+def get_page_store():
+    """
+    Return the shared page store, or None when config.PAGE_STORE_ENABLED is off
+    """
+    global page_store
+    if not config.PAGE_STORE_ENABLED:
+        return None
+    with page_store_lock:
+        if page_store is None:
+            page_store = PageStore(config.PAGE_STORE_PATH, config.PAGE_STORE_MAX_AGE_SECONDS)
+    return page_store
@@ -0,0 +1,182 @@
+"""
+Gemini and Tavily clients, created on first use, and Gemini structured output
+"""
+import ast
+import json
+import logging
+import threading
+import typing
+
+from typing_extensions import TypedDict
+
+from . import config
+from .cache import cached_call
+from .http_client import create_provider_session
+from .limits import call_provider
+
+logger = logging.getLogger(__name__)
+
+# Provider clients are created on first use, so importing the package (e.g. to
+# use only the crawler) never imports google-generativeai or tavily
+gemini_model = None
+tavily_client = None
+client_lock = threading.Lock()
+
+def get_gemini_model():
+    """
+    Return the shared Gemini model, configuring the API on first use
+    """
+    global gemini_model
+    with client_lock:
+        if gemini_model is None:
+            import google.generativeai as genai
+            genai.configure(api_key=config.GEMINI_API_KEY)
+            gemini_model = genai.GenerativeModel(config.GEMINI_MODEL_NAME)
+    return gemini_model
+
+def get_tavily_client():
+    """
+    Return the shared Tavily client, created on first use
+    """
+    global tavily_client
+    with client_lock:
+        if tavily_client is None:
+            from tavily import TavilyClient
+            # Tavily gets its own pooled session so its auth headers never reach crawled sites;
+            # its 429s are retried by the rate limiter, not the session
+            tavily_session = create_provider_session()
+            try:
+                tavily_client = TavilyClient(api_key=config.TAVILY_API_KEY, session=tavily_session)
+            except TypeError:
+                # Older tavily-python releases do not accept a session
+                tavily_client = TavilyClient(api_key=config.TAVILY_API_KEY)
+    return tavily_client
+
+class CompanyDetails(TypedDict):
+    """
+    Structured answer of the first Gemini stage (company search)
+    """
+    Website: str
+    Email: str
+    Phone: str
+    Facebook: str
+    Instagram: str
+    LinkedIn: str
+    Owner: str
+    Address: str
+    Match_Type: str
+    Confidence: str
+
+class RefinedFirm(TypedDict):
+    """
+    Structured answer of the Gemini refinement stage
+    """
+    Website: str
+    Email: str
+    Phone: str
+    Facebook: str
+    Instagram: str
+    LinkedIn: str
+    Owner: str
+    Address: str
+    Data_Quality: str
+    Sources_Used: str
+    Confidence_Score: str
+    Validation_Notes: str
+
+class RefinedBatchFirm(RefinedFirm):
+    """
+    One firm in a batched refinement answer
+    """
+    Firm_ID: str
+
+def generate_with_gemini(prompt, schema=None):
+    """
+    Send a prompt to Gemini through the response cache and return the response text.
+    With a schema, Gemini is asked for JSON constrained to that type.
+    """
+    params = {"model": config.GEMINI_MODEL_NAME}
+    generation_config = None
+    if schema is not None and config.GEMINI_STRUCTURED_OUTPUT:
+        params["schema"] = str(schema)
+        import google.generativeai as genai
+        generation_config = genai.GenerationConfig(
+            response_mime_type="application/json",
+            response_schema=schema
+        )
+    
+    def fetch():
+        model = get_gemini_model()
+        if generation_config is None:
+            return model.generate_content(prompt).text
+        return model.generate_content(prompt, generation_config=generation_config).text
+    
+    return cached_call("gemini", prompt, params, lambda: call_provider("gemini", fetch))
+
+def parse_gemini_json(raw_output):
+    """
+    Parse a JSON object or array from a Gemini response, tolerating markdown
+    fences and Python-style literals. Returns None if it cannot be parsed.
+    """
+    # Clean the response (remove any markdown formatting)
+    clean_result = raw_output.strip()
+    if clean_result.startswith('```json'):
+        clean_result = clean_result[7:]
+    elif clean_result.startswith('```'):
+        clean_result = clean_result[3:]
+    if clean_result.endswith('```'):
+        clean_result = clean_result[:-3]
+    clean_result = clean_result.strip()
+    
+    # Parse JSON
+    try:
+        return json.loads(clean_result)
+    except json.JSONDecodeError:
+        # Fallback to ast.literal_eval
+        try:
+            return ast.literal_eval(clean_result)
+        except:
+            return None
+
+def matches_schema_shape(data, schema):
+    """
+    Check that parsed JSON is an object (or list of objects for list[...] schemas)
+    """
+    if typing.get_origin(schema) is list:
+        return isinstance(data, list) and all(isinstance(item, dict) for item in data)
+    return isinstance(data, dict)
+
+def generate_json_with_gemini(prompt, schema):
+    """
+    Ask Gemini for JSON matching `schema` and return (raw_text, parsed).
+    A malformed answer gets up to GEMINI_JSON_REPAIR_RETRIES cheap repair
+    round trips that resend only the broken output, not the whole prompt.
+    raw_text is None if the call itself failed; parsed is None if the
+    answer could not be parsed.
+    """
+    raw_output = generate_with_gemini(prompt, schema)
+    if not raw_output:
+        return None, None
+    
+    parsed = parse_gemini_json(raw_output)
+    attempt = 0
+    while not matches_schema_shape(parsed, schema) and attempt < config.GEMINI_JSON_REPAIR_RETRIES:
+        attempt += 1
+        kind = "a JSON array of objects" if typing.get_origin(schema) is list else "a JSON object"
+        logger.warning(f"Malformed Gemini JSON, sending repair request ({attempt}/{config.GEMINI_JSON_REPAIR_RETRIES})")
+        repair_prompt = f"""
+        The text below was meant to be {kind} but it is not valid JSON.
+        Fix only the JSON syntax (quotes, commas, brackets, escaping) and drop any text around it.
+        Do not add, remove or change any values.
+        RESPOND ONLY WITH THE CORRECTED JSON.
+
+        {raw_output}
+        """
+        repaired = generate_with_gemini(repair_prompt, schema)
+        if not repaired:
+            break
+        parsed = parse_gemini_json(repaired)
+    
+    if not matches_schema_shape(parsed, schema):
+        return raw_output, None
+    return raw_output, parsed
@@ -0,0 +1,389 @@
+"""
+Gemini refinement of the collected source data, single and batched
+"""
+import itertools
+import json
+import logging
+import threading
+from concurrent.futures import Future
+
+from . import config
+from .limits import count_provider_calls, note_provider_calls
+from .metrics import timed_stage
+from .providers import RefinedBatchFirm, RefinedFirm, generate_json_with_gemini
+from .validation import is_url_accessible, validate_email, validate_phone
+
+logger = logging.getLogger(__name__)
+
+def format_source_evidence(company, industry, location, gemini_data, tavily_data, serp_data):
+    """
+    Format the data collected for one firm for a refinement prompt
+    """
+    return f"""
+        COMPANY: {company}
+        INDUSTRY: {industry}
+        LOCATION: {location}
+        
+        DATA SOURCE 1 - GEMINI AI:
+        {json.dumps(gemini_data, indent=2, ensure_ascii=False) if gemini_data else "No data found"}
+        
+        DATA SOURCE 2 - TAVILY SEARCH:
+        {json.dumps(tavily_data, indent=2, ensure_ascii=False) if tavily_data else "No data found"}
+        
+        DATA SOURCE 3 - SERP API RESULTS:
+        {json.dumps(serp_data, indent=2) if serp_data else "No data found"}
+        """
+
+@timed_stage("refine")
+def refine_data_with_gemini(company, industry, location, gemini_data, tavily_data, serp_data):
+    """
+    Use Gemini to analyze and refine all collected data sources
+    """
+    try:
+        # Prepare data summary for Gemini
+        data_summary = format_source_evidence(company, industry, location, gemini_data, tavily_data, serp_data)
+        
+        prompt = f"""
+        You are a data validation expert. Analyze the following company information collected from multiple sources and provide the MOST ACCURATE and RELIABLE data.
+
+        {data_summary}
+
+        VALIDATION RULES:
+        1. Company name must match "{company}" exactly or very closely
+        2. Industry must be "{industry}" or closely related
+        3. Location must be "{location}" or nearby areas
+        4. Cross-reference data from all sources
+        5. Choose the most reliable and consistent information
+        6. Verify email formats are valid
+        7. Verify phone numbers are Indian format
+        8. Verify URLs are accessible and relevant
+
+        QUALITY CHECKS:
+        - If multiple sources provide same data, it's more reliable
+        - Prefer official websites over social media for contact info
+        - Prefer business directories (JustDial, IndiaMART) for phone/address
+        - Validate email domains match company names when possible
+        - Ensure social media profiles belong to the correct company
+
+                 OUTPUT FORMAT - RESPOND ONLY WITH VALID JSON:
+         {{
+           "Website": "https://example.com or BLANK",
+           "Email": "info@example.com or BLANK", 
+           "Phone": "+91 98765 43210 or BLANK",
+           "Facebook": "https://facebook.com/company or BLANK",
+           "Instagram": "https://instagram.com/company or BLANK", 
+           "LinkedIn": "https://linkedin.com/company/company or BLANK",
+           "Owner": "Owner Name or BLANK",
+           "Address": "Complete Address or BLANK",
+           "Data_Quality": "EXCELLENT/GOOD/FAIR/POOR",
+           "Sources_Used": "List of sources used",
+           "Confidence_Score": "1-10 scale",
+           "Validation_Notes": "Brief notes on data reliability"
+         }}
+
+         CRITICAL INSTRUCTIONS:
+         - RESPOND ONLY WITH VALID JSON - NO OTHER TEXT
+         - Only provide data you are confident belongs to "{company}" in "{industry}"
+         - If sources conflict, choose the most authoritative source
+         - If data quality is poor or unreliable, mark fields as "BLANK"
+         - Provide reasoning for data quality assessment
+         - Better to have "BLANK" than incorrect data
+         """
+         
+        raw_output, refined = generate_json_with_gemini(prompt, RefinedFirm)
+        if raw_output and refined is None:
+            logger.error(f"Failed to parse JSON for {company}: {raw_output.strip()[:200]}...")
+            # Log the failure
+            log_gemini_failure(company, industry, location, raw_output)
+        return refined
+         
+    except Exception as e:
+        logger.error(f"Gemini refinement error for {company}: {e}")
+        return None
+
+@timed_stage("refine_batch")
+def refine_batch_with_gemini(firms):
+    """
+    Use one Gemini call to refine several firms at once. `firms` is a list of
+    dicts with id, company, industry, location and the three source results.
+    The instruction block is sent once and the answer is a JSON array keyed by Firm_ID.
+    Returns (raw_text, parsed list) like generate_json_with_gemini.
+    """
+    try:
+        evidence = "\n".join(
+            f"""
+        ===== FIRM_ID: {firm['id']} ====={format_source_evidence(firm['company'], firm['industry'], firm['location'], firm['gemini'], firm['tavily'], firm['serp'])}"""
+            for firm in firms
+        )
+        
+        prompt = f"""
+        You are a data validation expert. For EACH firm below, analyze the company information collected from multiple sources and provide the MOST ACCURATE and RELIABLE data.
+        Treat every firm independently - never copy data from one firm to another.
+
+        {evidence}
+
+        VALIDATION RULES (apply to each firm with its own COMPANY, INDUSTRY and LOCATION):
+        1. Company name must match the firm's COMPANY exactly or very closely
+        2. Industry must be the firm's INDUSTRY or closely related
+        3. Location must be the firm's LOCATION or nearby areas
+        4. Cross-reference data from all sources
+        5. Choose the most reliable and consistent information
+        6. Verify email formats are valid
+        7. Verify phone numbers are Indian format
+        8. Verify URLs are accessible and relevant
+
+        QUALITY CHECKS:
+        - If multiple sources provide same data, it's more reliable
+        - Prefer official websites over social media for contact info
+        - Prefer business directories (JustDial, IndiaMART) for phone/address
+        - Validate email domains match company names when possible
+        - Ensure social media profiles belong to the correct company
+
+        OUTPUT FORMAT - RESPOND ONLY WITH A VALID JSON ARRAY, ONE OBJECT PER FIRM:
+        [
+          {{
+            "Firm_ID": "the FIRM_ID given above",
+            "Website": "https://example.com or BLANK",
+            "Email": "info@example.com or BLANK",
+            "Phone": "+91 98765 43210 or BLANK",
+            "Facebook": "https://facebook.com/company or BLANK",
+            "Instagram": "https://instagram.com/company or BLANK",
+            "LinkedIn": "https://linkedin.com/company/company or BLANK",
+            "Owner": "Owner Name or BLANK",
+            "Address": "Complete Address or BLANK",
+            "Data_Quality": "EXCELLENT/GOOD/FAIR/POOR",
+            "Sources_Used": "List of sources used",
+            "Confidence_Score": "1-10 scale",
+            "Validation_Notes": "Brief notes on data reliability"
+          }}
+        ]
+
+        CRITICAL INSTRUCTIONS:
+        - RESPOND ONLY WITH VALID JSON - NO OTHER TEXT
+        - Return exactly one object for each of these Firm_IDs: {", ".join(firm['id'] for firm in firms)}
+        - If sources conflict, choose the most authoritative source
+        - If data quality is poor or unreliable, mark fields as "BLANK"
+        - Better to have "BLANK" than incorrect data
+        """
+        
+        return generate_json_with_gemini(prompt, list[RefinedBatchFirm])
+    
+    except Exception as e:
+        logger.error(f"Gemini batch refinement error for {len(firms)} firms: {e}")
+        return None, None
+
+def log_gemini_failure(company, industry, location, raw_output):
+    """
+    Append an unparseable Gemini response to gemini_failures.log
+    """
+    with open("gemini_failures.log", "a", encoding="utf-8") as log:
+        log.write(f"\n{'='*50}\n")
+        log.write(f"Company: {company}\n")
+        log.write(f"Industry: {industry}\n") 
+        log.write(f"Location: {location}\n")
+        log.write(f"Raw Gemini Output:\n{raw_output}\n")
+        log.write(f"{'='*50}\n")
+
+def field_text(data, key):
+    """
+    Read a Gemini JSON field as stripped text (JSON null becomes "")
+    """
+    value = data.get(key)
+    return str(value).strip() if value is not None else ""
+
+def validate_refined_fields(company, data_dict):
+    """
+    Validate and clean one firm's refined fields
+    """
+    validated_data = {}
+    
+    # Website validation
+    website = field_text(data_dict, "Website")
+    if website and website != "BLANK":
+        if is_url_accessible(website):
+            validated_data["Website"] = website
+            logger.info(f"✅ Valid website found for {company}: {website}")
+        else:
+            logger.warning(f"⚠️ Website not accessible for {company}: {website}")
+    
+    # Email validation
+    email = field_text(data_dict, "Email")
+    if email and email != "BLANK":
+        if validate_email(email):
+            validated_data["Email"] = email
+            logger.info(f"✅ Valid email found for {company}: {email}")
+        else:
+            logger.warning(f"⚠️ Invalid email format for {company}: {email}")
+    
+    # Phone validation
+    phone = field_text(data_dict, "Phone")
+    if phone and phone != "BLANK":
+        if validate_phone(phone):
+            validated_data["Phone"] = phone
+            logger.info(f"✅ Valid phone found for {company}: {phone}")
+        else:
+            logger.warning(f"⚠️ Invalid phone format for {company}: {phone}")
+    
+    # Social media validation (basic URL check)
+    for social in ["Facebook", "Instagram", "LinkedIn"]:
+        social_url = field_text(data_dict, social)
+        if social_url and social_url != "BLANK":
+            if social.lower() in social_url.lower():
+                validated_data[social] = social_url
+                logger.info(f"✅ Valid {social} found for {company}: {social_url}")
+    
+    # Owner and Address (no validation needed)
+    for field in ["Owner", "Address"]:
+        value = field_text(data_dict, field)
+        if value and value != "BLANK":
+            validated_data[field] = value
+    
+    # Quality metrics
+    validated_data["Data_Quality"] = data_dict.get("Data_Quality", "POOR")
+    validated_data["Sources_Used"] = data_dict.get("Sources_Used", "Unknown")
+    validated_data["Confidence_Score"] = data_dict.get("Confidence_Score", "0")
+    validated_data["Validation_Notes"] = data_dict.get("Validation_Notes", "")
+    
+    return validated_data
+
+def process_refined_data(company, industry, location, refined_result):
+    """
+    Process and validate refined data with smart priority matrix
+    """
+    try:
+        # refined_result is the parsed RefinedFirm dict (None if Gemini failed)
+        if isinstance(refined_result, dict):
+            return validate_refined_fields(company, refined_result)
+            
+        return None
+        
+    except Exception as e:
+        logger.error(f"Error processing refined data for {company}: {e}")
+        return None
+
+def refine_and_validate(firm):
+    """
+    Refine and validate a single firm with its own Gemini call
+    """
+    refined_result = refine_data_with_gemini(
+        firm['company'], firm['industry'], firm['location'],
+        firm['gemini'], firm['tavily'], firm['serp']
+    )
+    return process_refined_data(firm['company'], firm['industry'], firm['location'], refined_result)
+
+def refine_and_validate_batch(firms):
+    """
+    Refine several firms in one Gemini call and validate each result.
+    If the batch response cannot be parsed, the batch is split in half and
+    retried; firms missing from an otherwise valid response are retried as
+    a smaller batch. A batch of one uses the single-firm prompt.
+    Returns {firm id: validated data or None}.
+    """
+    if len(firms) == 1:
+        return {firms[0]['id']: refine_and_validate(firms[0])}
+    
+    # Firm IDs are positional so the same batch always builds the same (cacheable) prompt
+    by_prompt_id = {f"F{i + 1}": firm for i, firm in enumerate(firms)}
+    prompt_firms = [dict(firm, id=prompt_id) for prompt_id, firm in by_prompt_id.items()]
+    
+    raw_output, parsed = refine_batch_with_gemini(prompt_firms)
+    if not raw_output:
+        # Gemini call failed or was skipped by the rate limiter - splitting won't help
+        return {firm['id']: None for firm in firms}
+    
+    results = {}
+    if parsed is not None:
+        for item in parsed:
+            firm = by_prompt_id.get(field_text(item, "Firm_ID"))
+            if firm is not None and firm['id'] not in results:
+                results[firm['id']] = validate_refined_fields(firm['company'], item)
+    
+    missing = [firm for firm in firms if firm['id'] not in results]
+    if not missing:
+        return results
+    
+    if results:
+        # Partial answer: retry only the firms Gemini left out
+        logger.warning(f"Gemini batch answer missed {len(missing)} of {len(firms)} firms, retrying them")
+        results.update(refine_and_validate_batch(missing))
+    else:
+        # Unparseable answer: split the batch and retry each half
+        logger.warning(f"Failed to parse Gemini batch answer for {len(firms)} firms, splitting batch")
+        middle = len(firms) // 2
+        results.update(refine_and_validate_batch(firms[:middle]))
+        results.update(refine_and_validate_batch(firms[middle:]))
+    return results
+
+class RefinementBatcher:
+    """
+    Collect refinement requests from enrichment worker threads and send them
+    to Gemini in batches. A batch is flushed once it is full, or after
+    max_wait seconds so a partly filled batch never stalls the run.
+    """
+
+    def __init__(self, batch_size=None, max_wait=None):
+        self.batch_size = batch_size if batch_size is not None else config.REFINE_BATCH_SIZE
+        self.max_wait = max_wait if max_wait is not None else config.REFINE_BATCH_MAX_WAIT
+        self.lock = threading.Lock()
+        self.pending = []
+        self.timer = None
+        self.ids = itertools.count(1)
+
+    @property
+    def enabled(self):
+        return self.batch_size > 1
+
+    def refine(self, company, industry, location, gemini_data, tavily_data, serp_data):
+        """
+        Queue one firm for batched refinement and wait for its validated data
+        """
+        future = Future()
+        firm = {
+            "company": company, "industry": industry, "location": location,
+            "gemini": gemini_data, "tavily": tavily_data, "serp": serp_data,
+        }
+        with self.lock:
+            firm["id"] = str(next(self.ids))
+            self.pending.append((firm, future))
+            batch = self.take() if len(self.pending) >= self.batch_size else None
+            if batch is None and self.timer is None:
+                self.timer = threading.Timer(self.max_wait, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+        if batch:
+            self.run(batch)
+        result = future.result()
+        # The batch may have run on another firm's thread or the timer
+        note_provider_calls(future.provider_calls)
+        return result
+
+    def take(self):
+        """
+        Remove and return the pending batch (lock must be held)
+        """
+        batch, self.pending = self.pending, []
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        return batch
+
+    def flush(self):
+        """
+        Send whatever is pending, used when the wait timer fires
+        """
+        with self.lock:
+            batch = self.take()
+        if batch:
+            self.run(batch)
+
+    def run(self, batch):
+        firms = [firm for firm, _ in batch]
+        with count_provider_calls() as calls:
+            try:
+                results = refine_and_validate_batch(firms)
+            except Exception as e:
+                logger.error(f"Batched refinement failed for {len(firms)} firms: {e}")
+                results = {}
+        for firm, future in batch:
+            future.provider_calls = calls
+            future.set_result(results.get(firm["id"]))
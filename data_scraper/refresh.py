@@ -0,0 +1,99 @@
+"""
+Per-field provenance and incremental refresh of previously enriched firms
+"""
+import datetime
+import json
+import logging
+
+from . import config
+from .validation import is_missing, validate_email, validate_phone
+
+logger = logging.getLogger(__name__)
+
+# Output columns whose source and last verification time are tracked
+TRACKED_FIELDS = ["Website", "Email", "Phone", "Facebook", "Instagram", "LinkedIn", "Founder(s)/Owner(s)/Director(s)"]
+# Fields the website crawl can refresh; the rest only come from the search sources
+CRAWL_FIELDS = {"Email", "Phone", "Facebook", "Instagram", "LinkedIn"}
+
+def is_blank(value):
+    """
+    True for a missing or whitespace-only cell
+    """
+    return is_missing(value) or not str(value).strip()
+
+def load_provenance(row):
+    """
+    Read a firm's provenance column: {field: {"source", "verified_at"}}
+    """
+    value = row.get(config.PROVENANCE_COLUMN)
+    if is_blank(value):
+        return {}
+    try:
+        provenance = json.loads(value)
+    except (TypeError, ValueError):
+        logger.warning(f"Ignoring unreadable provenance for {row.get('Company Name', 'Unknown')}")
+        return {}
+    return provenance if isinstance(provenance, dict) else {}
+
+def field_is_valid(field, value):
+    """
+    Whether a stored value is usable; Email and Phone hold comma-separated lists
+    """
+    if is_blank(value):
+        return False
+    if field == "Email":
+        return all(validate_email(part.strip()) for part in str(value).split(","))
+    if field == "Phone":
+        return all(validate_phone(part.strip()) for part in str(value).split(","))
+    return True
+
+def stale_fields(row, max_age_days, now=None):
+    """
+    Fields of a firm worth re-fetching: missing, failing validation, or last
+    verified more than max_age_days ago (or never). Only fields the pipeline
+    can refresh for this firm are returned: the website crawl refreshes
+    CRAWL_FIELDS, the search sources refresh everything when there is no website.
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    provenance = load_provenance(row)
+    fields = TRACKED_FIELDS if is_blank(row.get("Website")) else [field for field in TRACKED_FIELDS if field in CRAWL_FIELDS]
+    stale = set()
+    for field in fields:
+        # A blank field that was recently looked for is fresh: nothing was found
+        if not is_blank(row.get(field)) and not field_is_valid(field, row.get(field)):
+            stale.add(field)
+            continue
+        try:
+            verified_at = datetime.datetime.fromisoformat(provenance[field]["verified_at"])
+        except (KeyError, TypeError, ValueError):
+            # Values from the input file or an older run have no verification time
+            stale.add(field)
+            continue
+        if now - verified_at > datetime.timedelta(days=max_age_days):
+            stale.add(field)
+    return stale
+
+def with_provenance(row, updates, source, stale=None):
+    """
+    Stamp the fields in `updates` with their source and verification time,
+    merged into the firm's provenance column. A blank result is stamped too,
+    so a refresh does not look again for something recently not found.
+    With `stale` (refresh mode), only those fields are updated and an
+    existing value is never replaced by a blank.
+    """
+    if stale is not None:
+        updates = {
+            field: value for field, value in updates.items()
+            if field in stale and not (is_blank(value) and not is_blank(row.get(field)))
+        }
+    if not updates:
+        return updates
+
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+    provenance = load_provenance(row)
+    for field in updates:
+        if field in TRACKED_FIELDS:
+            provenance[field] = {"source": source, "verified_at": now}
+    updates = dict(updates)
+    updates[config.PROVENANCE_COLUMN] = json.dumps(provenance, sort_keys=True)
+    return updates
@@ -0,0 +1,692 @@
+"""
+Search sources (Gemini, Tavily, SERP API) and how they are combined for one firm
+"""
+import contextvars
+import logging
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait, TimeoutError as FutureTimeoutError
+
+from . import config
+from .cache import cached_call
+from .extract import contact_extractor
+from .http_client import provider_get
+from .limits import RateLimitedError, call_provider, count_provider_calls
+from .metrics import metrics, timed_stage
+from .providers import CompanyDetails, generate_json_with_gemini, get_tavily_client
+from .refine import field_text, log_gemini_failure, validate_refined_fields
+from .validation import NON_DIGIT_PATTERN, normalize_domain
+
+logger = logging.getLogger(__name__)
+
+# Default pool for the per-firm source fan-out, created on first use; an Enricher uses its own
+source_executor = None
+source_executor_lock = threading.Lock()
+
+def create_source_executor(max_workers):
+    """
+    Pool for the per-firm source fan-out: a thread per source for each of max_workers firms enriched at once
+    """
+    return ThreadPoolExecutor(max_workers=max(1, max_workers) * len(SOURCE_FUNCTIONS), thread_name_prefix="source")
+
+def get_source_executor():
+    """
+    Return the default source pool, sized from config.MAX_WORKERS when first used
+    """
+    global source_executor
+    with source_executor_lock:
+        if source_executor is None:
+            source_executor = create_source_executor(config.MAX_WORKERS)
+    return source_executor
+
+@timed_stage("gemini_search")
+def get_company_details_from_gemini(company, industry, location):
+    prompt = f"""
+    You are an expert internet researcher. Search the web comprehensively to find information about this EXACT company:
+
+    TARGET COMPANY:
+    Company Name: "{company}"
+    Business Type: {industry}
+    Location: {location}
+
+    COMPREHENSIVE SEARCH STRATEGY - Use ALL these search methods:
+
+    1. BASIC SEARCHES:
+    - "{company}"
+    - "{company}" {location}
+    - "{company}" {industry}
+    - "{company}" {industry} {location}
+    - {company} contact details
+    - {company} phone number
+    - {company} email address
+
+    2. BUSINESS DIRECTORY SEARCHES:
+    - "{company}" site:justdial.com
+    - "{company}" site:indiamart.com
+    - "{company}" site:tradeindia.com
+    - "{company}" site:sulekha.com
+    - "{company}" site:yellowpages.co.in
+    - "{company}" site:google.com/maps
+    - "{company}" {location} justdial
+    - "{company}" {location} indiamart
+    - "{company}" {location} business directory
+
+    3. SOCIAL MEDIA SEARCHES:
+    - "{company}" site:facebook.com
+    - "{company}" site:instagram.com
+    - "{company}" site:linkedin.com
+    - "{company}" facebook page
+    - "{company}" instagram profile
+    - "{company}" linkedin company
+
+    4. CONTACT SEARCHES:
+    - "{company}" contact us
+    - "{company}" address phone
+    - "{company}" email contact
+    - "{company}" {location} contact
+    - "{company}" owner director
+    - "{company}" proprietor
+
+    5. WEBSITE SEARCHES:
+    - "{company}" official website
+    - "{company}" .com
+    - "{company}" .in
+    - "{company}" .co.in
+    - site:{company.lower().replace(' ', '')}.com
+    - site:{company.lower().replace(' ', '')}.in
+
+    VALIDATION REQUIREMENTS:
+    - Company name must match "{company}" (exact or very close spelling)
+    - Industry/business type should be "{industry}" or related
+    - Location should be "{location}" or nearby areas
+    - Cross-verify information from multiple sources
+
+    WHAT TO EXTRACT:
+    - Official website URL (check multiple domains)
+    - Business email addresses (info@, contact@, admin@, sales@)
+    - Phone numbers (mobile, landline, WhatsApp Business)
+    - Complete business address with pincode
+    - Facebook page URL
+    - Instagram profile URL
+    - LinkedIn company page URL
+    - Owner/Proprietor/Director names
+    - Year of establishment (if available)
+
+    SEARCH LIKE A HUMAN:
+    - Try different keyword combinations
+    - Check business listings thoroughly
+    - Look for contact pages on websites
+    - Search for company reviews and mentions
+    - Check government business registrations
+    - Look for trade associations and memberships
+
+    OUTPUT FORMAT - RESPOND ONLY WITH VALID JSON:
+    {{
+      "Website": "Full URL or BLANK",
+      "Email": "Email address or BLANK",
+      "Phone": "Phone number or BLANK",
+      "Facebook": "Facebook URL or BLANK",
+      "Instagram": "Instagram URL or BLANK",
+      "LinkedIn": "LinkedIn URL or BLANK",
+      "Owner": "Owner name(s) or BLANK",
+      "Address": "Complete address or BLANK",
+      "Match_Type": "EXACT/PARTIAL/NOT_FOUND",
+      "Confidence": "HIGH/MEDIUM/LOW"
+    }}
+
+    CRITICAL INSTRUCTIONS:
+    - Search extensively using ALL the above methods
+    - Provide REAL data only, no placeholder text
+    - If you find the company on JustDial, extract ALL available information
+    - Cross-reference data from multiple sources for accuracy
+    - Include phone numbers, addresses, and contact details from business directories
+    - Better to provide verified data than guess
+    """
+    
+    try:
+        raw_output, details = generate_json_with_gemini(prompt, CompanyDetails)
+        if raw_output and details is None:
+            logger.error(f"Failed to parse Gemini search JSON for {company}: {raw_output.strip()[:200]}...")
+            log_gemini_failure(company, industry, location, raw_output)
+        return details
+    except Exception as e:
+        print(f"Gemini API Error: {e}")
+        return None
+
+def run_tavily_query(query):
+    """
+    Send a single advanced Tavily search (through the response cache)
+    """
+    params = {
+        "search_depth": "advanced",
+        "max_results": 3,
+        "include_domains": [
+            "justdial.com", "indiamart.com", "sulekha.com", 
+            "yellowpages.co.in", "tradeindia.com", "exportersindia.com",
+            "facebook.com", "instagram.com", "linkedin.com",
+            "google.com", "maps.google.com"
+        ],
+        "include_answer": True
+    }
+    return cached_call(
+        "tavily",
+        query,
+        params,
+        lambda: call_provider("tavily", lambda: get_tavily_client().search(query=query, **params))
+    )
+
+def extract_tavily_info(all_results, company, industry, location):
+    """
+    Extract contact fields from Tavily results that are relevant to the target company
+    """
+    extracted_info = {
+        "website": "",
+        "email": "",
+        "phone": "",
+        "facebook": "",
+        "instagram": "",
+        "linkedin": "",
+        "owner": "",
+        "address": ""
+    }
+    
+    # Combine all content for analysis and validate company relevance
+    combined_content = ""
+    company_keywords = company.lower().split()
+    industry_keywords = industry.lower().split()
+    location_keywords = location.lower().split()
+    
+    for result in all_results:
+        # Check if result is relevant to our target company
+        result_text = ""
+        if 'content' in result:
+            result_text += result['content'].lower()
+        if 'title' in result:
+            result_text += result['title'].lower()
+        if 'url' in result:
+            result_text += result['url'].lower()
+        
+        # Validate if this result is about our target company
+        company_match = any(keyword in result_text for keyword in company_keywords)
+        location_match = any(keyword in result_text for keyword in location_keywords)
+        
+        # More flexible matching - require company name and either industry or location
+        industry_match = any(keyword in result_text for keyword in industry_keywords)
+        
+        # Include results that mention company name + (industry OR location)
+        if company_match and (industry_match or location_match):
+            if 'content' in result:
+                combined_content += result['content'] + "\n"
+            if 'title' in result:
+                combined_content += result['title'] + "\n"
+            
+            if 'url' in result:
+                # Extract social media URLs directly (only if relevant to our company)
+                url = result['url']
+                if 'facebook.com' in url and not extracted_info["facebook"]:
+                    # Additional validation for social media
+                    if any(keyword in url.lower() for keyword in company_keywords):
+                        extracted_info["facebook"] = url
+                elif 'instagram.com' in url and not extracted_info["instagram"]:
+                    if any(keyword in url.lower() for keyword in company_keywords):
+                        extracted_info["instagram"] = url
+                elif 'linkedin.com' in url and not extracted_info["linkedin"]:
+                    if any(keyword in url.lower() for keyword in company_keywords):
+                        extracted_info["linkedin"] = url
+                elif not extracted_info["website"] and any(domain in url for domain in ['.com', '.in', '.co.in', '.org']):
+                    if 'facebook' not in url and 'instagram' not in url and 'linkedin' not in url:
+                        if any(keyword in url.lower() for keyword in company_keywords):
+                            extracted_info["website"] = url
+    
+    # Extract emails, phones and addresses from content in one pass
+    if combined_content:
+        contacts = contact_extractor.scan(combined_content)
+        
+        if contacts["emails"]:
+            extracted_info["email"] = contacts["emails"][0]
+        
+        for phone in contacts["phones"]:
+            # Clean up the phone number
+            phone = re.sub(r'[^\d+]', '', phone)
+            if len(phone) >= 10:
+                extracted_info["phone"] = phone
+                break
+        
+        if contacts["addresses"]:
+            extracted_info["address"] = contacts["addresses"][0]
+    
+    return extracted_info
+
+@timed_stage("tavily")
+def search_with_tavily(company, industry, location):
+    """
+    Use Tavily to search the internet comprehensively for company information
+    """
+    try:
+        # Comprehensive search queries like a human would use on Google
+        search_queries = [
+            # Basic company searches
+            f'"{company}"',
+            f'"{company}" {location}',
+            f'"{company}" {industry}',
+            f'"{company}" {industry} {location}',
+            
+            # Contact information searches
+            f'"{company}" contact details',
+            f'"{company}" phone number',
+            f'"{company}" email address',
+            f'"{company}" {location} contact',
+            f'"{company}" address phone',
+            
+            # Business directory searches
+            f'"{company}" justdial',
+            f'"{company}" indiamart',
+            f'"{company}" {location} justdial',
+            f'"{company}" {location} indiamart',
+            f'"{company}" {location} business directory',
+            f'"{company}" yellowpages',
+            f'"{company}" sulekha',
+            
+            # Website searches
+            f'"{company}" official website',
+            f'"{company}" website',
+            f'"{company}" .com',
+            f'"{company}" .in',
+            
+            # Social media searches
+            f'"{company}" facebook',
+            f'"{company}" instagram',
+            f'"{company}" linkedin',
+            f'"{company}" social media',
+            
+            # Owner/business searches
+            f'"{company}" owner',
+            f'"{company}" proprietor',
+            f'"{company}" director',
+            f'"{company}" {location} owner'
+        ]
+        
+        # Limit queries per firm to avoid too many API calls
+        search_queries = search_queries[:config.TAVILY_MAX_QUERIES]
+        
+        # Results keyed by query position so extraction order is deterministic
+        results_by_query = {}
+        
+        # Run queries concurrently, keeping at most TAVILY_MAX_IN_FLIGHT in flight
+        with ThreadPoolExecutor(max_workers=config.TAVILY_MAX_IN_FLIGHT) as pool:
+            pending = {}
+            next_query = 0
+            while next_query < len(search_queries) or pending:
+                while next_query < len(search_queries) and len(pending) < config.TAVILY_MAX_IN_FLIGHT:
+                    query = search_queries[next_query]
+                    print(f"  🔍 Tavily searching ({next_query+1}/{len(search_queries)}): {query}")
+                    # Run in a copy of this context so the firm's call counting sees the query
+                    pending[pool.submit(contextvars.copy_context().run, run_tavily_query, query)] = next_query
+                    next_query += 1
+                
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    query_index = pending.pop(future)
+                    try:
+                        response = future.result()
+                        if response and 'results' in response:
+                            results_by_query[query_index] = response['results']
+                    except Exception as e:
+                        print(f"    ❌ Tavily query failed: {e}")
+                
+                # Stop early once every field has been filled from relevant results
+                if config.TAVILY_STOP_EARLY and results_by_query:
+                    all_results = [r for i in sorted(results_by_query) for r in results_by_query[i]]
+                    extracted_info = extract_tavily_info(all_results, company, industry, location)
+                    if all(extracted_info[field] for field in config.TAVILY_STOP_EARLY_FIELDS):
+                        for future in pending:
+                            future.cancel()
+                        skipped = len(search_queries) - next_query
+                        print(f"    ⏹️ Tavily stopping early for {company}: all fields found, skipped {skipped} queries")
+                        break
+        
+        all_results = [r for i in sorted(results_by_query) for r in results_by_query[i]]
+        if not all_results:
+            return None
+        
+        extracted_info = extract_tavily_info(all_results, company, industry, location)
+        
+        # Return the fields found, in the same shape as the SERP API result
+        if any(extracted_info.values()):
+            extracted_info["match_type"] = "TAVILY_SEARCH"
+            extracted_info["confidence"] = "MEDIUM"
+            return extracted_info
+        
+        return None
+        
+    except Exception as e:
+        print(f"    ❌ Tavily search error: {e}")
+        return None
+
+@timed_stage("serp")
+def search_with_serp_api(company, industry, location):
+    """
+    Use SERP API to search Google for company information
+    """
+    try:
+        print(f"  🔍 SERP API searching Google for: {company}")
+        
+        # Construct search query
+        search_query = f'"{company}" {industry} {location} contact phone email'
+        
+        # SERP API endpoint
+        url = config.SERP_API_URL
+        params = {
+            'api_key': config.SERP_API_KEY,
+            'engine': 'google',
+            'q': search_query,
+            'num': 10,
+            'gl': 'in',  # India
+            'hl': 'en'   # English
+        }
+        
+        def request():
+            response = provider_get(url, params=params)
+            if response.status_code == 429:
+                retry_after = response.headers.get("Retry-After")
+                raise RateLimitedError("SERP API 429", float(retry_after) if retry_after and retry_after.isdigit() else None)
+            return response
+        
+        def fetch():
+            response = call_provider("serp", request)
+            if response is None:
+                return None
+            metrics.increment("bytes_downloaded_total", len(response.content), source="serp")
+            if response.status_code != 200:
+                print(f"    ❌ SERP API error: {response.status_code}")
+                return None
+            return response.json()
+        
+        # The API key is left out of the cache key
+        cache_params = {k: v for k, v in params.items() if k != 'api_key'}
+        data = cached_call("serp", search_query, cache_params, fetch)
+        
+        if data is not None:
+            # Extract information from search results
+            extracted_info = {
+                "website": "",
+                "email": "",
+                "phone": "",
+                "facebook": "",
+                "instagram": "",
+                "linkedin": "",
+                "owner": "",
+                "address": "",
+                "raw_results": []
+            }
+            
+            # Process organic results
+            if 'organic_results' in data:
+                for result in data['organic_results']:
+                    result_info = {
+                        'title': result.get('title', ''),
+                        'link': result.get('link', ''),
+                        'snippet': result.get('snippet', ''),
+                        'displayed_link': result.get('displayed_link', '')
+                    }
+                    extracted_info['raw_results'].append(result_info)
+                    
+                    # Extract website
+                    if not extracted_info['website']:
+                        link = result.get('link', '')
+                        if any(domain in link for domain in ['.com', '.in', '.co.in', '.org']):
+                            if not any(social in link for social in ['facebook', 'instagram', 'linkedin', 'twitter']):
+                                extracted_info['website'] = link
+                    
+                    # Extract social media links
+                    link = result.get('link', '')
+                    if 'facebook.com' in link and not extracted_info['facebook']:
+                        extracted_info['facebook'] = link
+                    elif 'instagram.com' in link and not extracted_info['instagram']:
+                        extracted_info['instagram'] = link
+                    elif 'linkedin.com' in link and not extracted_info['linkedin']:
+                        extracted_info['linkedin'] = link
+                    
+                
+                # Extract emails and phones from all snippets in one pass
+                snippets = "\n".join(r['snippet'] for r in extracted_info['raw_results'] if r['snippet'])
+                contacts = contact_extractor.scan(snippets)
+                if contacts["emails"]:
+                    extracted_info['email'] = contacts["emails"][0]
+                if contacts["phones"]:
+                    extracted_info['phone'] = contacts["phones"][0]
+            
+            # Process knowledge graph if available
+            if 'knowledge_graph' in data:
+                kg = data['knowledge_graph']
+                if not extracted_info['website'] and 'website' in kg:
+                    extracted_info['website'] = kg['website']
+                if not extracted_info['phone'] and 'phone' in kg:
+                    extracted_info['phone'] = kg['phone']
+                if not extracted_info['address'] and 'address' in kg:
+                    extracted_info['address'] = kg['address']
+            
+            return extracted_info
+        else:
+            return None
+            
+    except Exception as e:
+        print(f"    ❌ SERP API search error: {e}")
+        return None
+
+SOURCE_FUNCTIONS = {
+    "gemini": get_company_details_from_gemini,
+    "tavily": search_with_tavily,
+    "serp": search_with_serp_api
+}
+
+class SourceCall:
+    """
+    One source query for a firm, run on a source pool. Its deadline
+    (SOURCE_TIMEOUTS) starts when the query starts running, so time spent
+    queued behind other firms' sources does not count against it.
+    """
+
+    def __init__(self, executor, name, company, industry, location):
+        self.name = name
+        self.company = company
+        self.started = threading.Event()
+        self.started_at = None
+        self.calls = []
+        self.future = executor.submit(self.run, SOURCE_FUNCTIONS[name], company, industry, location)
+
+    def run(self, func, *args):
+        self.started_at = time.monotonic()
+        self.started.set()
+        with count_provider_calls() as calls:
+            self.calls = calls
+            return func(*args)
+
+    def result(self):
+        """
+        Wait for the source; one that fails or times out contributes None.
+        A query still queued after its timeout is dropped without running.
+        """
+        name, company = self.name, self.company
+        timeout = config.SOURCE_TIMEOUTS[name]
+        try:
+            if not self.started.wait(timeout):
+                raise FutureTimeoutError()
+            return self.future.result(timeout=max(0, timeout - (time.monotonic() - self.started_at)))
+        except FutureTimeoutError:
+            self.future.cancel()
+            metrics.increment("source_errors_total", source=name, kind="timeout")
+            state = "timed out" if self.started.is_set() else "was still queued"
+            print(f"    ⏱️ {name} {state} after {timeout}s for {company}")
+            logger.warning(f"Source timeout: {name} for {company} {state} after {timeout}s")
+            return None
+        except Exception as e:
+            metrics.increment("source_errors_total", source=name, kind="error")
+            print(f"    ❌ {name} failed for {company}: {e}")
+            return None
+
+def collect_source_data(company, industry, location, sources=None, executor=None):
+    """
+    Query Gemini, Tavily and SERP API (or just `sources`) concurrently for one
+    firm on `executor` (default: the shared source pool).
+    Each source gets its own deadline; a source that fails, times out or is
+    not selected contributes None so refinement can go ahead with the others.
+    """
+    sources = config.SOURCES if sources is None else sources
+    executor = get_source_executor() if executor is None else executor
+    calls = [SourceCall(executor, name, company, industry, location) for name in SOURCE_FUNCTIONS if name in sources]
+    
+    results = {name: None for name in SOURCE_FUNCTIONS}
+    for call in calls:
+        results[call.name] = call.result()
+    
+    return results["gemini"], results["tavily"], results["serp"]
+
+class SourceCostTracker:
+    """
+    Count source and refinement calls made or skipped by adaptive
+    orchestration, for the estimated cost report at the end of a run.
+    A call answered from the response cache or dropped by a rate limiter
+    is not counted as made.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.made = {}
+        self.skipped = {}
+
+    def record(self, names, made=True):
+        with self.lock:
+            counts = self.made if made else self.skipped
+            for name in names:
+                counts[name] = counts.get(name, 0) + 1
+
+    def report(self):
+        spent = sum(config.SOURCE_COSTS.get(name, 0) * count for name, count in self.made.items())
+        saved = sum(config.SOURCE_COSTS.get(name, 0) * count for name, count in self.skipped.items())
+        skipped = ", ".join(f"{name} x{count}" for name, count in sorted(self.skipped.items())) or "none"
+        print(f"💰 Adaptive sources: est. ${spent:.2f} spent, ${saved:.2f} saved (skipped calls: {skipped})")
+        logger.info(f"Adaptive sources: est. spent ${spent:.4f}, saved ${saved:.4f}, made {self.made}, skipped {self.skipped}")
+
+# Contact fields shared by all three sources (SERP/Tavily key -> Gemini key), and
+# the fields whose disagreement needs Gemini to reconcile (owner/address are free text)
+SOURCE_FIELDS = {
+    "website": "Website",
+    "email": "Email",
+    "phone": "Phone",
+    "facebook": "Facebook",
+    "instagram": "Instagram",
+    "linkedin": "LinkedIn",
+    "owner": "Owner",
+    "address": "Address"
+}
+RECONCILED_FIELDS = ["website", "email", "phone", "facebook", "instagram", "linkedin"]
+
+def source_fields(result):
+    """
+    Read the non-blank contact fields from a source result (Gemini's
+    capitalised keys or the lowercase SERP/Tavily keys)
+    """
+    fields = {}
+    if not isinstance(result, dict):
+        return fields
+    for field, gemini_key in SOURCE_FIELDS.items():
+        value = field_text(result, field) or field_text(result, gemini_key)
+        if value and value.upper() != "BLANK":
+            fields[field] = value
+    return fields
+
+def normalize_field_value(field, value):
+    """
+    Normalize a field value so equivalent answers from different sources compare equal
+    """
+    if field == "website":
+        return normalize_domain(value)
+    if field == "phone":
+        return NON_DIGIT_PATTERN.sub('', value)[-10:]
+    if field in ("facebook", "instagram", "linkedin"):
+        return re.sub(r'^https?://(www\.)?', '', value.lower()).rstrip('/')
+    return " ".join(value.lower().split())
+
+def merge_source_fields(results):
+    """
+    Combine the fields reported by each source. Sources that agree on a value
+    reinforce each other: confidence = 1 - product of (1 - source confidence).
+    Returns {field: {"value", "confidence", "sources", "conflict"}}.
+    """
+    candidates = {}
+    for name, result in results.items():
+        for field, value in source_fields(result).items():
+            groups = candidates.setdefault(field, {})
+            group = groups.setdefault(normalize_field_value(field, value), {"value": value, "sources": []})
+            group["sources"].append(name)
+    
+    merged = {}
+    for field, groups in candidates.items():
+        scored = []
+        for group in groups.values():
+            doubt = 1.0
+            for name in group["sources"]:
+                doubt *= 1 - config.SOURCE_CONFIDENCE.get(name, 0.5)
+            scored.append((1 - doubt, group))
+        confidence, best = max(scored, key=lambda item: item[0])
+        merged[field] = {
+            "value": best["value"],
+            "confidence": round(confidence, 2),
+            "sources": best["sources"],
+            "conflict": len(groups) > 1 and field in RECONCILED_FIELDS
+        }
+    return merged
+
+def collect_source_data_adaptive(company, industry, location, sources=None, costs=None, executor=None):
+    """
+    Query sources one at a time in SOURCE_ORDER (cheapest first) and stop
+    once every ADAPTIVE_REQUIRED_FIELDS field is filled with at least
+    ADAPTIVE_MIN_CONFIDENCE. Calls made and skipped are recorded in `costs`
+    (a SourceCostTracker). Returns ({source: result or None}, merged fields).
+    """
+    sources = config.SOURCES if sources is None else sources
+    executor = get_source_executor() if executor is None else executor
+    costs = costs if costs is not None else SourceCostTracker()
+    order = [name for name in config.SOURCE_ORDER if name in sources]
+    results = {name: None for name in SOURCE_FUNCTIONS}
+    merged = {}
+    for position, name in enumerate(order):
+        print(f"  💡 Adaptive: querying {name}...")
+        call = SourceCall(executor, name, company, industry, location)
+        results[name] = call.result()
+        if call.calls:
+            costs.record([name])
+        
+        merged = merge_source_fields(results)
+        if all(merged.get(field, {}).get("confidence", 0) >= config.ADAPTIVE_MIN_CONFIDENCE
+               for field in config.ADAPTIVE_REQUIRED_FIELDS):
+            skipped = order[position + 1:]
+            if skipped:
+                costs.record(skipped, made=False)
+                print(f"    ⏹️ Required fields found for {company}, skipping {', '.join(skipped)}")
+            break
+    
+    return results, merged
+
+def validated_from_sources(company, merged):
+    """
+    Build validated data straight from agreeing sources, skipping Gemini refinement
+    """
+    confidence = sum(entry["confidence"] for entry in merged.values()) / len(merged)
+    if confidence >= 0.9:
+        quality = "EXCELLENT"
+    elif confidence >= config.ADAPTIVE_MIN_CONFIDENCE:
+        quality = "GOOD"
+    elif confidence >= 0.5:
+        quality = "FAIR"
+    else:
+        quality = "POOR"
+    
+    data_dict = {SOURCE_FIELDS[field]: entry["value"] for field, entry in merged.items()}
+    data_dict["Data_Quality"] = quality
+    data_dict["Sources_Used"] = ", ".join(sorted({name for entry in merged.values() for name in entry["sources"]}))
+    data_dict["Confidence_Score"] = str(round(confidence * 10))
+    data_dict["Validation_Notes"] = "Sources agreed; Gemini refinement skipped"
+    return validate_refined_fields(company, data_dict)
@@ -0,0 +1,211 @@
+"""
+URL reachability checks and email/phone validation
+"""
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+import requests
+
+from . import config
+from .cache import ResponseCache, get_response_cache
+from .http_client import get_http_session, http_get
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+def normalize_domain(url):
+    """
+    Normalize a URL to its domain (lowercase, no www., no default port)
+    """
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    parsed = urlparse(url)
+    domain = (parsed.hostname or "").lower().rstrip(".")
+    if domain.startswith("www."):
+        domain = domain[4:]
+    if parsed.port and parsed.port not in (80, 443):
+        domain = f"{domain}:{parsed.port}"
+    return domain
+
+def normalize_check_url(url):
+    """
+    Normalize a full URL for the URL check cache: the normalized domain plus
+    the path (no trailing slash) and query, so pages on a shared host such as
+    sites.google.com keep separate verdicts
+    """
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    parsed = urlparse(url)
+    key = normalize_domain(url) + parsed.path.rstrip("/")
+    return f"{key}?{parsed.query}" if parsed.query else key
+
+# In-memory URL check verdicts: normalized URL -> verdict, and domain -> host
+# reachability. Both are LRUs of URL_CHECK_MEMORY_ENTRIES, so memory does not
+# grow with the input; the response cache keeps every entry on disk.
+url_check_cache = OrderedDict()
+host_check_cache = OrderedDict()
+url_check_lock = threading.Lock()
+
+def remember(cache, key, entry):
+    """
+    Put an entry in an in-memory LRU, dropping the least recently used
+    beyond URL_CHECK_MEMORY_ENTRIES; caller must hold url_check_lock
+    """
+    cache[key] = entry
+    cache.move_to_end(key)
+    while len(cache) > config.URL_CHECK_MEMORY_ENTRIES:
+        cache.popitem(last=False)
+
+def lookup_cached(cache, kind, key):
+    """
+    Fresh entry for key from the in-memory cache or the response cache, or None
+    """
+    with url_check_lock:
+        entry = cache.get(key)
+        if entry is not None:
+            cache.move_to_end(key)
+    response_cache = get_response_cache()
+    if entry is None and response_cache is not None:
+        entry = response_cache.get(ResponseCache.make_key(kind, key))
+    if entry is None or time.time() - entry["checked_at"] > config.URL_CHECK_TTL_SECONDS:
+        return None
+    with url_check_lock:
+        remember(cache, key, entry)
+    return entry
+
+def store_cached(cache, kind, key, entry):
+    """
+    Keep an entry in the in-memory cache and the response cache
+    """
+    with url_check_lock:
+        remember(cache, key, entry)
+    response_cache = get_response_cache()
+    if response_cache is not None:
+        response_cache.set(ResponseCache.make_key(kind, key), kind, entry)
+
+def lookup_url_check(url):
+    """
+    Return the cached verdict for this URL if it is still fresh, without any
+    network I/O. Verdicts (and redirect targets) are kept per full URL; the
+    only thing shared across a domain is that its host could not be reached.
+    """
+    verdict = lookup_cached(url_check_cache, "url_check", normalize_check_url(url))
+    if verdict is not None:
+        return verdict
+    host = lookup_cached(host_check_cache, "host_check", normalize_domain(url))
+    if host is not None and not host["reachable"]:
+        return {"ok": False, "status": None, "final_url": url, "checked_at": host["checked_at"]}
+    return None
+
+def store_url_check(url, ok, status=None, final_url=None):
+    """
+    Record a reachability verdict for the URL, and whether its host answered at all
+    """
+    now = time.time()
+    verdict = {"ok": ok, "status": status, "final_url": final_url or url, "checked_at": now}
+    store_cached(url_check_cache, "url_check", normalize_check_url(url), verdict)
+    # Any HTTP response, even an error status, means the host is up
+    store_cached(host_check_cache, "host_check", normalize_domain(url), {"reachable": status is not None, "checked_at": now})
+    return verdict
+
+def check_url(url):
+    """
+    Check that a URL responds without downloading its body.
+    Tries HEAD first and falls back to a streamed, ranged GET for servers
+    that reject HEAD. Verdicts are cached per URL.
+    """
+    verdict = lookup_url_check(url)
+    metrics.increment("url_check_cache_total", result="miss" if verdict is None else "hit")
+    if verdict is not None:
+        return verdict
+    
+    with metrics.timer("url_check"):
+        try:
+            response = get_http_session().head(url, timeout=config.HTTP_TIMEOUT, allow_redirects=True)
+            status = response.status_code
+            final_url = response.url
+            response.close()
+        except requests.RequestException:
+            status = None
+            final_url = url
+        
+        # Some servers reject HEAD - retry with a GET that stops at the headers
+        if status in (400, 403, 405, 501):
+            try:
+                response = http_get(url, stream=True, headers={"Range": "bytes=0-0"})
+                status = response.status_code
+                final_url = response.url
+                response.close()
+            except requests.RequestException:
+                status = None
+    
+    # 416 means the server is up but did not like the range request
+    ok = status is not None and (status < 400 or status == 416)
+    return store_url_check(url, ok, status, final_url)
+
+def is_url_accessible(url):
+    """
+    Check if a URL is accessible and valid
+    """
+    if not url or url.lower() in ['blank', 'n/a', 'not found', '']:
+        return False
+    
+    try:
+        # Add protocol if missing
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+        
+        # Parse URL to check if it's valid
+        parsed = urlparse(url)
+        if not parsed.netloc:
+            return False
+        
+        return check_url(url)["ok"]
+    except:
+        return False
+
+# Precompiled validation patterns
+EMAIL_VALIDATION_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+NON_DIGIT_PATTERN = re.compile(r'\D')
+
+def validate_email(email):
+    """
+    Validate email format
+    """
+    if not email or email.lower() in ['blank', 'n/a', 'not found', '']:
+        return False
+    
+    return EMAIL_VALIDATION_PATTERN.match(email) is not None
+
+def is_missing(value):
+    """
+    True for None, NaN and pandas NA - a pd.isna() for single values that
+    works without importing pandas
+    """
+    if value is None:
+        return True
+    try:
+        return bool(value != value)
+    except TypeError:
+        # pandas.NA refuses to be converted to bool
+        return True
+
+def validate_phone(phone):
+    """
+    Validate Indian phone number format
+    """
+    if not phone or phone.lower() in ['blank', 'n/a', 'not found', '']:
+        return False
+    
+    # Remove all non-digit characters
+    digits = NON_DIGIT_PATTERN.sub('', phone)
+    
+    # Check if it's a valid Indian number (10 digits or 10 digits with country code)
+    if len(digits) == 10 or (len(digits) == 12 and digits.startswith('91')):
+        return True
+    
+    return False
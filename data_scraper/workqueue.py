@@ -0,0 +1,243 @@
+"""
+Durable work queue for running enrichment across several worker processes
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+class WorkQueue:
+    """
+    Firm work queue backed by one SQLite file shared by worker processes on
+    one host. The file uses SQLite's rollback journal rather than WAL, which
+    needs shared memory that network filesystems do not provide; even so,
+    SQLite over NFS/SMB is only as safe as that filesystem's locking.
+    A coordinator enqueues the firm list; workers lease jobs, enrich them and
+    write the updates back. A lease that is not completed or renewed within
+    lease_seconds expires, so a crashed worker's firms are handed out again,
+    up to max_attempts leases per firm.
+
+    The same file holds the provider call counts of all workers
+    (reserve_call), so RATE_LIMITS and budgets apply to the whole run rather
+    than to each worker process.
+
+    Any object with the same methods (enqueue, lease, renew, complete, fail,
+    release, counts, results, reserve_call) can stand in for it, e.g. a
+    Redis-backed queue for workers on several machines.
+    """
+
+    # RATE_LIMITS windows in seconds; the budget counts every call made through the queue
+    WINDOWS = {"per_second": 1, "per_minute": 60, "per_day": 86400}
+
+    def __init__(self, path, lease_seconds=None, max_attempts=None):
+        self.path = path
+        self.lease_seconds = lease_seconds if lease_seconds is not None else config.QUEUE_LEASE_SECONDS
+        self.max_attempts = max_attempts if max_attempts is not None else config.QUEUE_MAX_ATTEMPTS
+        self.lock = threading.Lock()
+        # Other processes hold the write lock briefly while leasing; wait for them
+        self.conn = sqlite3.connect(path, timeout=60, check_same_thread=False, isolation_level=None)
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=DELETE")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY,
+                    row TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker TEXT,
+                    lease_expires REAL,
+                    updates TEXT,
+                    error TEXT,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires)")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS provider_calls (
+                    provider TEXT NOT NULL,
+                    window INTEGER NOT NULL,
+                    window_start REAL NOT NULL,
+                    calls INTEGER NOT NULL,
+                    PRIMARY KEY (provider, window)
+                )
+            """)
+
+    def enqueue(self, df):
+        """
+        Add every firm in the DataFrame as a pending job, in row order
+        """
+        records = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.executemany(
+                    "INSERT INTO jobs (row, updated_at) VALUES (?, ?)",
+                    [(json.dumps(record, ensure_ascii=False, default=str), now) for record in records]
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return len(records)
+
+    def lease(self, worker, count):
+        """
+        Lease up to `count` pending or expired jobs to a worker.
+        Returns a list of (job id, row dict).
+        """
+        now = time.time()
+        with self.lock:
+            # IMMEDIATE takes the write lock up front so two workers never lease the same job
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Expired leases that used up their attempts are not retried again
+                exhausted = self.conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = 'lease expired', updated_at = ? "
+                    "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                    (now, now, self.max_attempts)
+                ).rowcount
+                rows = self.conn.execute(
+                    "SELECT id, row FROM jobs WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) "
+                    "ORDER BY id LIMIT ?",
+                    (now, count)
+                ).fetchall()
+                self.conn.executemany(
+                    "UPDATE jobs SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    [(worker, now + self.lease_seconds, now, job_id) for job_id, _ in rows]
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        if exhausted:
+            logger.warning(f"Work queue: {exhausted} firms failed after {self.max_attempts} expired leases")
+        return [(job_id, json.loads(row)) for job_id, row in rows]
+
+    def renew(self, worker, job_ids):
+        """
+        Extend the worker's leases on jobs it is still working on
+        """
+        if not job_ids:
+            return
+        expires = time.time() + self.lease_seconds
+        with self.lock:
+            self.conn.executemany(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND status = 'leased' AND worker = ?",
+                [(expires, job_id, worker) for job_id in job_ids]
+            )
+
+    def complete(self, job_id, worker, updates):
+        """
+        Store a job's updates. Returns False if the lease was lost to another
+        worker in the meantime (its result is then discarded).
+        """
+        with self.lock:
+            changed = self.conn.execute(
+                "UPDATE jobs SET status = 'done', updates = ?, error = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND worker = ?",
+                (json.dumps(updates, ensure_ascii=False, default=str), time.time(), job_id, worker)
+            ).rowcount
+        return changed == 1
+
+    def fail(self, job_id, worker, error):
+        """
+        Return a failed job to the queue, or mark it failed once it has used up its attempts
+        """
+        with self.lock:
+            self.conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "error = ?, lease_expires = NULL, updated_at = ? WHERE id = ? AND status = 'leased' AND worker = ?",
+                (self.max_attempts, str(error), time.time(), job_id, worker)
+            )
+
+    def release(self, worker, job_ids):
+        """
+        Hand unfinished jobs back without counting the attempt (e.g. on Ctrl-C)
+        """
+        with self.lock:
+            self.conn.executemany(
+                "UPDATE jobs SET status = 'pending', attempts = attempts - 1, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND worker = ?",
+                [(time.time(), job_id, worker) for job_id in job_ids]
+            )
+
+    def counts(self):
+        """
+        Number of jobs per status: pending, leased, done and failed
+        """
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        with self.lock:
+            for status, count in self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"):
+                counts[status] = count
+        return counts
+
+    def results(self, batch_size=1000):
+        """
+        Yield (row dict, updates dict) for every job in enqueue order.
+        Jobs that are not done yet yield empty updates.
+        """
+        last_id = 0
+        while True:
+            with self.lock:
+                rows = self.conn.execute(
+                    "SELECT id, row, updates FROM jobs WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for job_id, row, updates in rows:
+                yield json.loads(row), json.loads(updates) if updates else {}
+            last_id = rows[-1][0]
+
+    def reserve_call(self, provider, limits):
+        """
+        Count one call to a paid provider against limits shared by every
+        worker: fixed windows for per_second/per_minute/per_day and a budget
+        for all calls made through this queue. Returns 0 when the call may go
+        ahead, the seconds until a window frees up, or None once the budget is spent.
+        """
+        now = time.time()
+        windows = [(window, limits[key]) for key, window in self.WINDOWS.items() if limits.get(key)]
+        if limits.get("budget") is not None:
+            # Window 0 never resets
+            windows.append((0, limits["budget"]))
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                wait = 0
+                for window, limit in windows:
+                    start = now - now % window if window else 0
+                    row = self.conn.execute(
+                        "SELECT window_start, calls FROM provider_calls WHERE provider = ? AND window = ?", (provider, window)
+                    ).fetchone()
+                    calls = row[1] if row is not None and row[0] == start else 0
+                    if calls >= limit:
+                        if not window:
+                            wait = None
+                            break
+                        wait = max(wait, start + window - now)
+                if wait == 0:
+                    for window, _ in windows:
+                        start = now - now % window if window else 0
+                        self.conn.execute(
+                            "INSERT INTO provider_calls (provider, window, window_start, calls) VALUES (?, ?, ?, 1) "
+                            "ON CONFLICT (provider, window) DO UPDATE SET "
+                            "calls = CASE WHEN window_start = excluded.window_start THEN calls + 1 ELSE 1 END, "
+                            "window_start = excluded.window_start",
+                            (provider, window, start)
+                        )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return wait
+
+    def close(self):
+        with self.lock:
+            self.conn.close()